@@ -3,9 +3,21 @@
 
 import os
 import sys
+import asyncio
+import hashlib
+import multiprocessing
+import time
+import threading
 import numpy as np
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Tuple, Dict, Any, Optional
+try:
+    from .magma import MAGMA_LUT  # 서버에서 ai.analysis 로 import 한 경우
+except ImportError:
+    from magma import MAGMA_LUT  # ai/ 에서 main.py 로 실행한 경우
 
 warnings.filterwarnings('ignore')  # 경고 메시지 무시 설정
 
@@ -78,140 +90,790 @@ async def convert_to_melspectrogram(base_path):
     except Exception as e:
         return {"success": False, "message": f"Mel-Spectrogram 변환에 실패하였습니다: {e}"}
 
-async def convert_all_to_melspectrograms(base_path: str) -> Dict[str, Any]:
+# ---------------------------------------------------------------------------
+# 멜스펙트로그램 → 모델 입력 직접 변환 (matplotlib / JPEG 왕복 없이 NumPy 로 처리)
+# ---------------------------------------------------------------------------
+MODEL_INPUT_SHAPE = (100, 100, 3)
+MEL_SAMPLE_RATE = 22050
+MEL_N_MELS = 128
+
+# librosa.display.specshow 기본 컬러맵(magma)의 256단계 LUT (matplotlib 과 동일)
+_MAGMA_LUT = np.array(MAGMA_LUT, dtype=np.float32)
+
+
+def compute_mel_db(wav_path: str) -> np.ndarray:
+    """wav 파일을 로드하여 Mel-Spectrogram(dB, ref=max) 행렬을 반환합니다."""
+    import librosa
+
+    y, sr = librosa.load(wav_path, sr=MEL_SAMPLE_RATE)
+    S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=MEL_N_MELS)
+    return librosa.power_to_db(S, ref=np.max)
+
+
+def _resize_matrix(n_in: int, n_out: int) -> np.ndarray:
+    """1차원 리샘플링 가중치 행렬 (n_out, n_in). 축소는 구간 평균, 확대는 선형 보간"""
+    weights = np.zeros((n_out, n_in), dtype=np.float32)
+    scale = n_in / n_out
+    if n_out <= n_in:
+        for i in range(n_out):
+            start, end = i * scale, (i + 1) * scale
+            for j in range(int(np.floor(start)), min(int(np.ceil(end)), n_in)):
+                weights[i, j] = min(end, j + 1) - max(start, j)
+            weights[i] /= weights[i].sum()
+    else:
+        for i in range(n_out):
+            x = min(max((i + 0.5) * scale - 0.5, 0.0), n_in - 1)
+            j0 = int(np.floor(x))
+            j1 = min(j0 + 1, n_in - 1)
+            weights[i, j0] += 1.0 - (x - j0)
+            weights[i, j1] += x - j0
+    return weights
+
+
+def _apply_colormap(norm: np.ndarray) -> np.ndarray:
     """
-    base_path 내의 모든 .wav 파일에 대해 mel-spectrogram 이미지를 생성합니다.
-    결과는 base_path/voice-mels/*.jpg 로 저장하며, 생성된 이미지 경로 목록을 반환합니다.
+    0~1 로 정규화된 2차원 배열에 magma 컬러맵을 적용하여 (H, W, 3) 배열(0~1)을 반환합니다.
+    matplotlib ListedColormap 과 같은 방식으로 floor(x * N) 번째 색을 고릅니다 (보간 없음).
+    """
+    n = len(_MAGMA_LUT)
+    idx = np.clip(np.floor(np.nan_to_num(norm) * n), 0, n - 1).astype(np.int32)
+    return _MAGMA_LUT[idx]
+
+
+def mel_to_model_input(S_db: np.ndarray) -> np.ndarray:
+    """
+    Mel dB 행렬을 모델 입력 (100, 100, 3) float32 (0~1) 로 변환합니다.
+    specshow 와 동일하게 저주파가 아래쪽, 값 범위는 행렬의 최소~최대로 정규화합니다.
+    """
+    height, width = MODEL_INPUT_SHAPE[:2]
+    S_db = np.asarray(S_db, dtype=np.float32)
+    resized = _resize_matrix(S_db.shape[0], height) @ S_db @ _resize_matrix(S_db.shape[1], width).T
+    vmin, vmax = float(S_db.min()), float(S_db.max())
+    norm = (resized - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(resized)
+    return _apply_colormap(norm[::-1]).astype(np.float32)
+
+
+def save_mel_preview(model_input: np.ndarray, mel_path: str) -> str:
+    """모델 입력 배열을 미리보기 JPEG 로 저장하고 경로를 반환합니다."""
+    from PIL import Image
+
+    os.makedirs(os.path.dirname(mel_path), exist_ok=True)
+    pixels = np.clip(np.asarray(model_input) * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(mel_path, format="JPEG", quality=95)
+    return mel_path
+
+
+def wav_to_model_input(wav_path: str) -> np.ndarray:
+    """wav 한 개 → 모델 입력 배열 (프로세스 풀 워커에서 실행)"""
+    return mel_to_model_input(compute_mel_db(wav_path))
+
+
+_mel_pool: Optional[ProcessPoolExecutor] = None
+_mel_pool_lock = threading.Lock()
+
+
+def mel_pool_workers() -> int:
+    """멜 변환 프로세스 풀 크기 (AI_MEL_WORKERS, 기본 CPU 코어 수, 0 이면 풀 없이 스레드에서 실행)"""
+    try:
+        return max(0, int(os.getenv('AI_MEL_WORKERS', str(os.cpu_count() or 1))))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def get_mel_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    멜 변환용 프로세스 풀 (최초 사용 시 생성)
+    TensorFlow 스레드가 이미 떠 있는 프로세스를 fork 하면 자식이 교착될 수 있으므로 spawn 으로 시작합니다.
+    """
+    global _mel_pool
+    if _mel_pool is None:
+        with _mel_pool_lock:
+            workers = mel_pool_workers()
+            if _mel_pool is None and workers > 0:
+                _mel_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _mel_pool
+
+
+def shutdown_mel_pool():
+    global _mel_pool
+    with _mel_pool_lock:
+        if _mel_pool is not None:
+            _mel_pool.shutdown(wait=True, cancel_futures=True)
+            _mel_pool = None
+
+
+def _discard_mel_pool(pool: ProcessPoolExecutor):
+    """워커가 비정상 종료되어 깨진 풀을 정리 (다음 get_mel_pool() 호출 시 새 풀 생성)"""
+    global _mel_pool
+    with _mel_pool_lock:
+        if _mel_pool is pool:
+            _mel_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def compute_mel_inputs(wav_paths: List[str]) -> List[Any]:
+    """
+    wav 경로 목록 → 모델 입력 배열 목록 (프로세스 풀에서 병렬 실행, 실패한 항목은 예외 객체)
+    워커가 OOM 등으로 죽어 풀이 깨지면(BrokenProcessPool) 풀을 새로 만들어 해당 파일만 한 번 재시도합니다.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def _run(pool, path):
+        # 깨진 풀에 submit 하면 즉시 BrokenProcessPool 이 발생하므로 코루틴 안에서 호출
+        return await loop.run_in_executor(pool, wav_to_model_input, path)
+
+    pool = get_mel_pool()
+    results = list(await asyncio.gather(*[_run(pool, p) for p in wav_paths], return_exceptions=True))
+    broken = [i for i, r in enumerate(results) if isinstance(r, BrokenProcessPool)]
+    if broken and pool is not None:
+        _discard_mel_pool(pool)
+        pool = get_mel_pool()
+        retried = await asyncio.gather(*[_run(pool, wav_paths[i]) for i in broken], return_exceptions=True)
+        for i, r in zip(broken, retried):
+            results[i] = r
+        if pool is not None and any(isinstance(r, BrokenProcessPool) for r in retried):
+            _discard_mel_pool(pool)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 콘텐츠 해시 기반 캐시: 같은 음성 바이트가 다시 들어오면 디코딩/예측을 건너뜀
+# (메모리 LRU + 선택적 디스크 계층, AI_CACHE_DIR 지정 시 사용)
+# ---------------------------------------------------------------------------
+class FeatureCache:
+    """kind("mel" | "score") + 키 → np.ndarray 캐시"""
+
+    def __init__(self, max_items: Optional[int] = None, disk_dir: Optional[str] = None,
+                 disk_max_bytes: Optional[int] = None):
+        self.max_items = max_items if max_items is not None else int(os.getenv('AI_CACHE_MAX_ITEMS', '256'))
+        self.disk_dir = disk_dir if disk_dir is not None else os.getenv('AI_CACHE_DIR') or None
+        self.disk_max_bytes = (
+            disk_max_bytes if disk_max_bytes is not None
+            else int(float(os.getenv('AI_CACHE_DISK_MAX_MB', '512')) * 1024 * 1024)
+        )
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def _count(self, kind: str, what: str):
+        key = f"{kind}_{what}"
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _disk_path(self, kind: str, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{kind}-{key}.npy")
+
+    def get(self, kind: str, key: str) -> Optional[np.ndarray]:
+        mkey = f"{kind}:{key}"
+        with self._lock:
+            value = self._memory.get(mkey)
+            if value is not None:
+                self._memory.move_to_end(mkey)
+                self._count(kind, "hits")
+                return value
+        if self.disk_dir:
+            path = self._disk_path(kind, key)
+            try:
+                value = np.load(path, allow_pickle=False)
+                os.utime(path)  # LRU 순서 갱신
+                with self._lock:
+                    self._count(kind, "disk_hits")
+                self._put_memory(mkey, value)
+                return value
+            except Exception:
+                pass
+        with self._lock:
+            self._count(kind, "misses")
+        return None
+
+    def put(self, kind: str, key: str, value: np.ndarray):
+        value = np.asarray(value)
+        self._put_memory(f"{kind}:{key}", value)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                path = self._disk_path(kind, key)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, value, allow_pickle=False)
+                os.replace(tmp, path)
+                self._evict_disk()
+            except Exception:
+                pass
+
+    def _put_memory(self, mkey: str, value: np.ndarray):
+        with self._lock:
+            self._memory[mkey] = value
+            self._memory.move_to_end(mkey)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] = self.stats.get("evictions", 0) + 1
+
+    def _evict_disk(self):
+        """디스크 사용량이 disk_max_bytes 를 넘으면 가장 오래 사용되지 않은 파일부터 삭제"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self.stats["disk_evictions"] = self.stats.get("disk_evictions", 0) + 1
+            except OSError:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "memory_items": len(self._memory),
+            "max_items": self.max_items,
+            "disk_dir": self.disk_dir,
+            "disk_max_bytes": self.disk_max_bytes if self.disk_dir else None,
+            **self.stats,
+        }
+
+
+feature_cache = FeatureCache()
+
+# 멜 입력 캐시 키에 포함되는 변환 설정 (설정이 바뀌면 자동으로 다른 키)
+_MEL_CACHE_SUFFIX = f"sr{MEL_SAMPLE_RATE}-m{MEL_N_MELS}-{MODEL_INPUT_SHAPE[0]}x{MODEL_INPUT_SHAPE[1]}"
+
+
+def audio_hash(wav_path: str) -> str:
+    """오디오 파일 바이트의 sha256"""
+    h = hashlib.sha256()
+    with open(wav_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cached_mel(wav_path: str) -> Tuple[str, Optional[np.ndarray]]:
+    """(오디오 해시, 캐시된 멜 입력 또는 None). 파일 전체 읽기 + 디스크 캐시 조회이므로 스레드에서 실행"""
+    digest = audio_hash(wav_path)
+    return digest, feature_cache.get("mel", f"{digest}-{_MEL_CACHE_SUFFIX}")
+
+
+def _score_cache_key(audio_digest: str, model_name: str) -> Optional[str]:
+    version = model_version(model_name)
+    if version is None:
+        return None
+    return hashlib.sha256(f"{audio_digest}:{model_name}:{version}".encode()).hexdigest()
+
+
+async def convert_all_to_melspectrograms(base_path: str, save_images: bool = False) -> Dict[str, Any]:
+    """
+    base_path 내의 모든 .wav 파일에 대해 mel-spectrogram 을 계산하여 모델 입력 배열로 변환합니다.
+    파일별 변환은 프로세스 풀에서 병렬로 실행되어 이벤트 루프를 막지 않습니다.
+    결과 mels 는 [{"name", "input", "mel_path"}] 형태이며, 실패한 파일은 errors 에 개별로 담깁니다.
+    save_images=True 인 경우에만 base_path/voice-mels/*.jpg 미리보기 이미지를 저장하고
+    그 경로 목록(paths)을 함께 반환합니다.
     """
     try:
         import librosa
-        import librosa.display
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
 
         output_dir = os.path.join(base_path, "voice-mels")
-        os.makedirs(output_dir, exist_ok=True)
 
-        wav_files = [f for f in os.listdir(base_path) if f.lower().endswith('.wav')]
+        wav_files = sorted(f for f in os.listdir(base_path) if f.lower().endswith('.wav'))
         if not wav_files:
             return {"success": False, "message": f"해당 폴더에 .wav 파일이 없습니다: {base_path}"}
 
+        # 디코딩 전에 콘텐츠 해시로 캐시 조회, 미스인 파일만 프로세스 풀로 보냄
+        # (해시 계산과 디스크 캐시 입출력은 기본 스레드 풀에서 실행하여 이벤트 루프를 막지 않음)
+        loop = asyncio.get_running_loop()
+        lookups = await asyncio.gather(
+            *[loop.run_in_executor(None, _cached_mel, os.path.join(base_path, f)) for f in wav_files],
+            return_exceptions=True,
+        )
+        digests: Dict[str, Optional[str]] = {}
+        results: Dict[str, Any] = {}
+        for fname, lookup in zip(wav_files, lookups):
+            if isinstance(lookup, BaseException):
+                digests[fname] = None
+                results[fname] = lookup
+                continue
+            digests[fname], cached = lookup
+            if cached is not None:
+                results[fname] = cached
+
+        misses = [f for f in wav_files if f not in results]
+        computed = await compute_mel_inputs([os.path.join(base_path, f) for f in misses])
+        for fname, result in zip(misses, computed):
+            results[fname] = result
+        await asyncio.gather(*[
+            loop.run_in_executor(None, feature_cache.put, "mel", f"{digests[fname]}-{_MEL_CACHE_SUFFIX}", result)
+            for fname, result in zip(misses, computed) if not isinstance(result, BaseException)
+        ])
+
+        mels: List[Dict[str, Any]] = []
         mel_paths: List[str] = []
+        errors: List[Dict[str, str]] = []
         for fname in wav_files:
-            wav_path = os.path.join(base_path, fname)
+            name = os.path.splitext(fname)[0]
+            result = results[fname]
             try:
-                y, sr = librosa.load(wav_path, sr=22050)
-                S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
-                S_db = librosa.power_to_db(S, ref=np.max)
-                plt.figure(figsize=(1, 1))
-                librosa.display.specshow(S_db, sr=sr)
-                plt.axis('off')
-                plt.tight_layout()
-                mel_filename = os.path.splitext(fname)[0] + '.jpg'
-                mel_path = os.path.join(output_dir, mel_filename)
-                plt.savefig(mel_path, bbox_inches='tight', pad_inches=0, dpi=100)
-                plt.close()
-                mel_paths.append(mel_path)
+                if isinstance(result, BaseException):
+                    raise result
+                entry = {"name": name, "input": result, "mel_path": None, "audio_hash": digests[fname]}
+                if save_images:
+                    entry["mel_path"] = save_mel_preview(entry["input"], os.path.join(output_dir, name + '.jpg'))
+                    mel_paths.append(entry["mel_path"])
+                mels.append(entry)
             except Exception as e:
-                # 개별 파일 실패 시 다음 파일 진행
-                continue
-        if not mel_paths:
-            return {"success": False, "message": "Mel-Spectrogram 생성에 모두 실패했습니다."}
-        return {"success": True, "paths": mel_paths}
+                # 개별 파일 실패 시 기록 후 다음 파일 진행
+                errors.append({"name": fname, "message": f"Mel-Spectrogram 변환에 실패하였습니다: {e}"})
+        if not mels:
+            return {"success": False, "message": "Mel-Spectrogram 생성에 모두 실패했습니다.", "errors": errors}
+        return {"success": True, "mels": mels, "paths": mel_paths, "errors": errors}
     except ImportError as e:
         return {"success": False, "message": f"필요한 라이브러리가 없습니다: {e}"}
     except Exception as e:
         return {"success": False, "message": f"Mel-Spectrogram 일괄 변환 중 오류: {e}"}
 
-async def load_and_test_models(base_path, mel_paths: Optional[List[str]] = None):
-    """모델 로딩 및 테스트 (MCIvsAD 모델만 사용, 다중 이미지 지원)"""
+# ---------------------------------------------------------------------------
+# 모델 레지스트리: 워커(프로세스)당 모델을 한 번만 로드하고 재사용
+# (모델 경로 + 파일 mtime 기준으로 캐시, h5 파일이 바뀌면 백그라운드에서 재로딩)
+# ---------------------------------------------------------------------------
+_model_registry: Dict[str, Dict[str, Any]] = {}
+_model_registry_lock = threading.Lock()
+_reloading: set = set()
+_reloading_lock = threading.Lock()
+# 변경된 h5 재로딩 전용 스레드 (한 번에 하나씩)
+_model_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+
+def model_paths() -> Dict[str, str]:
+    """모델 이름 → h5 경로 (환경변수로 경로 지정 가능)"""
+    return {
+        'MCIvsAD': os.getenv('MCI_MODEL_PATH', 'save_model_72.7.h5'),
+    }
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS(바이트). 측정 불가 시 None"""
     try:
-        import tensorflow as tf
-        from tensorflow.keras.applications import VGG16
-        from tensorflow.keras import models, layers
-        from tensorflow.keras.preprocessing import image
-        import h5py
-
-        # 모델 로딩 설정 (환경변수로 경로 지정 가능)
-        mci_model_path = os.getenv('MCI_MODEL_PATH', 'save_model_72.7.h5')
-        model_paths = [
-            ('MCIvsAD', mci_model_path),
-        ]
-        loaded_models = {}
-
-        for model_name, model_path in model_paths:
-            if not os.path.exists(model_path):
-                continue
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    except Exception:
+        return None
+
+
+def _build_mci_model(model_path: str):
+    """VGG16 기반 MCIvsAD 모델 생성 후 h5 에서 Dense 가중치 로드. (model, 가중치 로드 여부) 반환"""
+    from tensorflow.keras.applications import VGG16
+    from tensorflow.keras import models, layers
+    import h5py
+
+    # VGG16 기반 모델 구조 생성
+    base_model = VGG16(weights='imagenet', include_top=False, input_shape=MODEL_INPUT_SHAPE)
+    model = models.Sequential([
+        base_model,
+        layers.Flatten(name='flatten'),
+        layers.Dense(10, activation='relu'),
+        layers.Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+
+    # 가중치 직접 로드 (h5py를 통해)
+    try:
+        with h5py.File(model_path, 'r') as f:
+            dense_weights = f['model_weights/dense/dense/kernel:0'][:]
+            dense_bias = f['model_weights/dense/dense/bias:0'][:]
+            dense_1_weights = f['model_weights/dense_1/dense_1/kernel:0'][:]
+            dense_1_bias = f['model_weights/dense_1/dense_1/bias:0'][:]
+
+            model.layers[2].set_weights([dense_weights, dense_bias])
+            model.layers[3].set_weights([dense_1_weights, dense_1_bias])
+        return model, True
+    except Exception:
+        # 가중치 로딩 실패, 기본 모델 사용
+        return model, False
+
+
+def _load_into_registry(model_name: str, model_path: str, mtime: float, previous: Optional[Dict[str, Any]]):
+    """모델을 생성하여 레지스트리에 등록 (호출 스레드에서 실행, 수 초 걸릴 수 있음)"""
+    rss_before = _current_rss_bytes()
+    started = time.perf_counter()
+    model, weights_loaded = _build_mci_model(model_path)
+    load_seconds = time.perf_counter() - started
+    rss_after = _current_rss_bytes()
+
+    _model_registry[model_name] = {
+        "model": model,
+        "path": model_path,
+        "mtime": mtime,
+        "weights_loaded": weights_loaded,
+        "load_seconds": load_seconds,
+        "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+        "param_count": int(model.count_params()),
+        "loaded_at": time.time(),
+        "reloads": (previous["reloads"] + 1) if previous else 0,
+    }
+    return model
+
+
+def _reload_in_background(model_name: str, model_path: str, mtime: float):
+    """h5 가 바뀐 모델을 로더 스레드에서 다시 로드. 완료될 때까지 기존 모델이 계속 사용됩니다."""
+    def _reload():
+        # 레지스트리 락은 잡지 않음 (로드 중에도 get_model 이 기존 모델을 바로 반환하도록)
+        entry = _model_registry.get(model_name)
+        try:
+            _load_into_registry(model_name, model_path, mtime, entry)
+        except Exception as e:
+            if entry:
+                # 같은 mtime 으로는 다시 시도하지 않음 (파일이 다시 바뀌면 재시도)
+                entry["failed_mtime"] = mtime
+                entry["last_reload_error"] = str(e)
+        finally:
+            with _reloading_lock:
+                _reloading.discard(model_name)
+
+    with _reloading_lock:
+        if model_name in _reloading:
+            return
+        _reloading.add(model_name)
+    _model_loader.submit(_reload)
+
+
+def get_model(model_name: str):
+    """
+    레지스트리에서 모델을 가져옵니다. 처음 호출될 때는 호출 스레드에서 로드하고(이벤트 루프에서는
+    load_models_async 사용), h5 파일의 mtime 이 바뀐 경우에는 로더 스레드에서 다시 로드하는 동안
+    기존 모델을 그대로 반환합니다.
+    모델 파일이 없으면 None 을 반환하고, 모델 생성 실패 시 예외를 그대로 전달합니다.
+    """
+    model_path = model_paths().get(model_name)
+    if not model_path or not os.path.exists(model_path):
+        return None
+    mtime = os.path.getmtime(model_path)
+
+    entry = _model_registry.get(model_name)
+    if entry and entry["path"] == model_path:
+        if entry["mtime"] != mtime and entry.get("failed_mtime") != mtime:
+            _reload_in_background(model_name, model_path, mtime)
+        return entry["model"]
+
+    with _model_registry_lock:
+        # 다른 스레드가 먼저 로드했는지 재확인
+        entry = _model_registry.get(model_name)
+        if entry and entry["path"] == model_path:
+            return entry["model"]
+        return _load_into_registry(model_name, model_path, mtime, entry)
+
+
+def model_version(model_name: str) -> Optional[str]:
+    """레지스트리에 로드된 모델의 버전 문자열 (경로 + mtime). 로드되지 않았으면 None"""
+    entry = _model_registry.get(model_name)
+    if not entry:
+        return None
+    return f"{entry['path']}:{entry['mtime']}:{int(entry['weights_loaded'])}"
+
+
+def load_models() -> Dict[str, Any]:
+    """설정된 모든 모델을 레지스트리에서 가져옵니다. (이름 → 모델, 파일이 없는 모델은 제외)"""
+    loaded_models = {}
+    for model_name in model_paths():
+        model = get_model(model_name)
+        if model is not None:
+            loaded_models[model_name] = model
+    return loaded_models
+
+
+async def load_models_async() -> Dict[str, Any]:
+    """load_models 를 스레드에서 실행"""
+    return await asyncio.get_running_loop().run_in_executor(None, load_models)
+
+
+def warmup_models() -> Dict[str, Any]:
+    """서버 시작 시 모델을 미리 로드하고 더미 입력으로 한 번 예측하여 그래프를 준비합니다."""
+    try:
+        loaded_models = load_models()
+        dummy = np.zeros((1,) + MODEL_INPUT_SHAPE, dtype=np.float32)
+        for model in loaded_models.values():
+            model.predict(dummy, verbose=0)
+        return {"success": True, "models": list(loaded_models)}
+    except ImportError as e:
+        return {"success": False, "message": f"필요한 라이브러리가 없습니다: {e}"}
+    except Exception as e:
+        return {"success": False, "message": f"모델 워밍업에 실패하였습니다: {e}"}
+
+
+def model_status() -> List[Dict[str, Any]]:
+    """레지스트리에 로드된 모델의 상태(로드 시간, 메모리 증가량 등)"""
+    status = []
+    for model_name, model_path in model_paths().items():
+        entry = _model_registry.get(model_name)
+        exists = os.path.exists(model_path)
+        item: Dict[str, Any] = {
+            "name": model_name,
+            "path": model_path,
+            "exists": exists,
+            "loaded": entry is not None,
+        }
+        if entry:
+            item.update({
+                "stale": not exists or os.path.getmtime(model_path) != entry["mtime"],
+                "weights_loaded": entry["weights_loaded"],
+                "load_seconds": round(entry["load_seconds"], 3),
+                "rss_delta_bytes": entry["rss_delta_bytes"],
+                "param_count": entry["param_count"],
+                "loaded_at": entry["loaded_at"],
+                "reloads": entry["reloads"],
+                "reloading": model_name in _reloading,
+                "last_reload_error": entry.get("last_reload_error"),
+            })
+        status.append(item)
+    return status
+
+
+def max_batch_size() -> int:
+    """한 번의 model.predict 에 넣을 최대 이미지 수 (AI_MAX_BATCH_SIZE, 기본 32)"""
+    try:
+        return max(1, int(os.getenv('AI_MAX_BATCH_SIZE', '32')))
+    except ValueError:
+        return 32
+
 
+def predict_in_batches(model, batch: np.ndarray, batch_size: Optional[int] = None) -> np.ndarray:
+    """(N, 100, 100, 3) 입력을 최대 배치 크기 단위로 예측하여 N 개의 점수(1차원)를 반환합니다."""
+    batch_size = batch_size or max_batch_size()
+    outputs = [
+        np.asarray(model.predict(batch[i:i + batch_size], batch_size=batch_size, verbose=0)).reshape(-1)
+        for i in range(0, len(batch), batch_size)
+    ]
+    return np.concatenate(outputs) if outputs else np.zeros((0,), dtype=np.float32)
+
+
+class InferenceBatcher:
+    """
+    동시 요청들의 멜 텐서를 잠시(max_wait_ms) 모아 공유 모델에 하나의 배치로 예측하고,
+    결과를 요청별로 다시 나눠 돌려주는 추론 큐. (AI 서비스 이벤트 루프 안에서 동작)
+    """
+
+    def __init__(self, max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 예측은 한 번에 하나씩 (TF 내부 스레드가 코어를 사용)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.stats = {"batches": 0, "requests": 0, "images": 0, "max_batch_images": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """현재 이벤트 루프에서 배치 처리 태스크 시작 (FastAPI startup 에서 호출)"""
+        if self.running:
+            return
+        if self.max_batch is None:
+            self.max_batch = max_batch_size()
+        if self.max_wait_ms is None:
+            try:
+                self.max_wait_ms = max(0.0, float(os.getenv('AI_BATCH_MAX_WAIT_MS', '5')))
+            except ValueError:
+                self.max_wait_ms = 5.0
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
             try:
-                # VGG16 기반 모델 구조 생성
-                base_model = VGG16(weights='imagenet', include_top=False, input_shape=(100, 100, 3))
-                model = models.Sequential([
-                    base_model,
-                    layers.Flatten(name='flatten'),
-                    layers.Dense(10, activation='relu'),
-                    layers.Dense(1, activation='sigmoid')
-                ])
-                model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-
-                # 가중치 직접 로드 (h5py를 통해)
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 대기 중인 요청은 실패 처리
+        while self._queue is not None and not self._queue.empty():
+            _, _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("inference batcher stopped"))
+
+    async def predict(self, model_name: str, inputs: np.ndarray) -> np.ndarray:
+        """(N, 100, 100, 3) 입력을 큐에 넣고 N 개의 점수를 기다립니다."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_name, inputs, fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            count = len(pending[0][1])
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+            # max_wait 동안 또는 max_batch 가 찰 때까지 수집
+            while count < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
                 try:
-                    with h5py.File(model_path, 'r') as f:
-                        dense_weights = f['model_weights/dense/dense/kernel:0'][:]
-                        dense_bias = f['model_weights/dense/dense/bias:0'][:]
-                        dense_1_weights = f['model_weights/dense_1/dense_1/kernel:0'][:]
-                        dense_1_bias = f['model_weights/dense_1/dense_1/bias:0'][:]
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                count += len(item[1])
+
+            by_model: Dict[str, list] = {}
+            for item in pending:
+                if not item[2].cancelled():
+                    by_model.setdefault(item[0], []).append(item)
+            for model_name, items in by_model.items():
+                await self._run_batch(loop, model_name, items)
+
+    async def _run_batch(self, loop, model_name: str, items: list):
+        try:
+            batch = np.concatenate([inputs for _, inputs, _ in items])
+            predictions = await loop.run_in_executor(self._executor, self._predict, model_name, batch)
+        except Exception as e:
+            for _, _, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(items)
+        self.stats["images"] += len(batch)
+        self.stats["max_batch_images"] = max(self.stats["max_batch_images"], len(batch))
+
+        # 요청별로 결과 분배
+        offset = 0
+        for _, inputs, fut in items:
+            n = len(inputs)
+            if not fut.done():
+                fut.set_result(predictions[offset:offset + n])
+            offset += n
+
+    def _predict(self, model_name: str, batch: np.ndarray) -> np.ndarray:
+        model = get_model(model_name)
+        if model is None:
+            raise RuntimeError(f"모델을 찾을 수 없습니다: {model_name}")
+        return predict_in_batches(model, batch, self.max_batch)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_ms,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **self.stats,
+        }
 
-                        model.layers[2].set_weights([dense_weights, dense_bias])
-                        model.layers[3].set_weights([dense_1_weights, dense_1_bias])
 
-                        loaded_models[model_name] = model
+# AI 서비스(main.py)에서 start() 한 경우에만 사용, 그 외(서버 내 직접 import)에는 바로 예측
+inference_batcher = InferenceBatcher()
 
-                except Exception as e:
-                    # 가중치 로딩 실패, 기본 모델 사용
-                    loaded_models[model_name] = model
 
-            except Exception as e:
-                # 모델 로딩 실패
-                return {"success": False, "message": f"모델을 로드하던 중 에러가 발생하였습니다: {e}"}
+async def load_and_test_models(
+    base_path,
+    mel_paths: Optional[List[str]] = None,
+    mel_inputs: Optional[List[Dict[str, Any]]] = None,
+):
+    """
+    모델 로딩 및 테스트 (MCIvsAD 모델만 사용, 다중 이미지 지원)
+    mel_inputs(convert_all_to_melspectrograms 의 mels)가 주어지면 배열을 그대로 사용하고,
+    그렇지 않으면 mel_paths 또는 base_path/voice-mels 의 JPEG 를 읽어 사용합니다.
+    """
+    try:
+        try:
+            # 레지스트리에서 캐시된 모델 사용 (최초 1회 또는 h5 변경 시에만 로드, 로드는 스레드에서)
+            loaded_models = await load_models_async()
+        except ImportError:
+            raise
+        except Exception as e:
+            # 모델 로딩 실패
+            return {"success": False, "message": f"모델을 로드하던 중 에러가 발생하였습니다: {e}"}
 
         if not loaded_models:
             return {"success": False, "message": "모델을 로드하는 데 실패하였습니다."}
 
-        img_dir = os.path.join(base_path, "voice-mels")
-        if not mel_paths:
-            # 수집
-            mel_paths = [
-                os.path.join(img_dir, f)
-                for f in os.listdir(img_dir)
-                if f.lower().endswith('.jpg')
-            ]
-        if not mel_paths:
-            return {"success": False, "message": "분석할 이미지(멜스펙트로그램)가 없습니다."}
-
-        scores: List[Tuple[str, float]] = []
-        for model_name, model in loaded_models.items():
+        # 통화 단위로 모든 멜 입력을 하나의 텐서로 쌓음
+        inputs: List[np.ndarray] = []
+        input_items: List[Tuple[str, Optional[str]]] = []  # (name, mel_path)
+        input_hashes: List[Optional[str]] = []  # 점수 캐시용 오디오 해시 (JPEG 입력은 None)
+        if mel_inputs:
+            for mel in mel_inputs:
+                inputs.append(mel["input"])
+                input_items.append((mel["name"], mel.get("mel_path")))
+                input_hashes.append(mel.get("audio_hash"))
+        else:
+            from tensorflow.keras.preprocessing import image
+
+            img_dir = os.path.join(base_path, "voice-mels")
+            if not mel_paths:
+                # 수집
+                mel_paths = [
+                    os.path.join(img_dir, f)
+                    for f in os.listdir(img_dir)
+                    if f.lower().endswith('.jpg')
+                ]
+            if not mel_paths:
+                return {"success": False, "message": "분석할 이미지(멜스펙트로그램)가 없습니다."}
+
             for mel_path in mel_paths:
                 try:
                     # 이미지 전처리
-                    img = image.load_img(mel_path, target_size=(100, 100))
-                    img_array = image.img_to_array(img)
-                    img_array = np.expand_dims(img_array, axis=0)
-                    img_array /= 255.0
-
-                    # 예측 실행
-                    prediction = model.predict(img_array, verbose=0)[0][0]
-                    score = float(prediction)
-                    scores.append((mel_path, score))
+                    img = image.load_img(mel_path, target_size=MODEL_INPUT_SHAPE[:2])
+                    inputs.append(image.img_to_array(img) / 255.0)
+                    input_items.append((os.path.splitext(os.path.basename(mel_path))[0], mel_path))
+                    input_hashes.append(None)
                 except Exception as e:
                     continue
+        if not inputs:
+            return {"success": False, "message": "모델 예측에 실패했습니다."}
+        batch = np.stack(inputs).astype(np.float32)
+
+        scores: List[Tuple[str, Optional[str], float]] = []
+        for model_name, model in loaded_models.items():
+            try:
+                # 같은 오디오 + 같은 모델 버전의 점수는 캐시에서 재사용
+                keys = [_score_cache_key(h, model_name) if h else None for h in input_hashes]
+                loop = asyncio.get_running_loop()
+                cached = await loop.run_in_executor(
+                    None, lambda: [feature_cache.get("score", k) if k else None for k in keys]
+                )
+                predictions = np.array([float(c[0]) if c is not None else 0.0 for c in cached], dtype=np.float32)
+                miss_idx = [i for i, c in enumerate(cached) if c is None]
+                if miss_idx:
+                    # 예측 실행 (한 번의 forward pass, 최대 배치 크기 단위로 분할)
+                    if inference_batcher.running:
+                        # 동시 요청들과 함께 하나의 배치로 예측
+                        miss_scores = await inference_batcher.predict(model_name, batch[miss_idx])
+                    else:
+                        # 배처가 없으면 기본 스레드 풀에서 예측 (이벤트 루프를 막지 않도록)
+                        miss_scores = await loop.run_in_executor(None, predict_in_batches, model, batch[miss_idx])
+                    for i, s in zip(miss_idx, miss_scores):
+                        predictions[i] = s
+                    await loop.run_in_executor(None, lambda: [
+                        feature_cache.put("score", keys[i], np.array([predictions[i]], dtype=np.float32))
+                        for i in miss_idx if keys[i]
+                    ])
+                scores.extend((name, p, float(s)) for (name, p), s in zip(input_items, predictions))
+            except Exception as e:
+                continue
 
         if not scores:
             return {"success": False, "message": "모델 예측에 실패했습니다."}
 
         # 평균 점수 계산 및 리스크 레벨
-        avg_score = float(np.mean([s for _, s in scores]))
+        avg_score = float(np.mean([s for _, _, s in scores]))
         if avg_score > 0.7:
             risk_level = "높은 위험도"
         elif avg_score > 0.4:
@@ -224,7 +886,7 @@ async def load_and_test_models(base_path, mel_paths: Optional[List[str]] = None)
             "result": {
                 "score": avg_score,
                 "risk_level": risk_level,
-                "details": [{"mel_path": p, "score": s} for p, s in scores]
+                "details": [{"name": n, "mel_path": p, "score": s} for n, p, s in scores]
             }
         }
 
@@ -234,41 +896,62 @@ async def load_and_test_models(base_path, mel_paths: Optional[List[str]] = None)
         return {"success": False, "message": f"모델 테스트에 실패하였습니다: {e}"}
 
 
-async def main(base_path, mel_pick: Optional[str] = None):
-    """메인 함수"""
+async def main(base_path, mel_pick: Optional[str] = None, preview: bool = True):
+    """
+    메인 함수
+    preview=True 이면 선택된 mel 한 장만 base_path/voice-mels 에 JPEG 로 저장하여 mel_path 로 반환합니다.
+    """
 
-    # 1. 멜스펙트로그램 생성(다중 파일)
+    # 1. 멜스펙트로그램 생성(다중 파일, 메모리 상에서 모델 입력으로 변환)
     mel_all_json = await convert_all_to_melspectrograms(base_path)
     if not mel_all_json.get("success"):
         return mel_all_json
-    mel_paths: List[str] = mel_all_json.get("paths", [])
+    mels: List[Dict[str, Any]] = mel_all_json.get("mels", [])
 
     # 2. 모델 테스트 (여러 이미지 대상)
-    model_json = await load_and_test_models(base_path, mel_paths)
+    model_json = await load_and_test_models(base_path, mel_inputs=mels)
 
     if not model_json["success"]:
         return model_json
 
     # mel 이미지 선택 로직
-    selected_mel = None
+    selected = None
     details = (model_json.get("result") or {}).get("details") or []
     if details:
         if mel_pick is None or mel_pick == "max":
             # 최고 점수의 mel 선택
-            selected_mel = max(details, key=lambda d: d.get("score", 0)).get("mel_path")
+            selected = max(details, key=lambda d: d.get("score", 0))
         elif mel_pick == "first":
-            selected_mel = details[0].get("mel_path")
+            selected = details[0]
         elif mel_pick == "last":
-            selected_mel = details[-1].get("mel_path")
+            selected = details[-1]
         else:
             # 숫자 인덱스 시도
             try:
                 idx = int(mel_pick)
                 if 0 <= idx < len(details):
-                    selected_mel = details[idx].get("mel_path")
+                    selected = details[idx]
                 else:
-                    selected_mel = details[0].get("mel_path")
+                    selected = details[0]
             except Exception:
-                selected_mel = details[0].get("mel_path")
+                selected = details[0]
+
+    # 선택된 mel 만 미리보기 이미지로 저장
+    selected_mel = None
+    if selected is not None:
+        selected_mel = selected.get("mel_path")
+        if selected_mel is None and preview:
+            mel = next((m for m in mels if m["name"] == selected.get("name")), None)
+            if mel is not None:
+                try:
+                    selected_mel = save_mel_preview(
+                        mel["input"], os.path.join(base_path, "voice-mels", mel["name"] + ".jpg")
+                    )
+                    selected["mel_path"] = selected_mel
+                except Exception:
+                    selected_mel = None
+
+    if mel_all_json.get("errors"):
+        model_json["result"]["errors"] = mel_all_json["errors"]
 
     return {"success": True, "result": model_json["result"], "mel_path": selected_mel}
@@ -1,10 +1,15 @@
 import os
+import asyncio
+import hmac
+import shutil
 import uuid
 from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import analysis
 
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware,
@@ -14,31 +19,89 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+@app.on_event("startup")
+async def on_startup():
+    # 워커 시작 시 모델을 미리 로드 (AI_MODEL_WARMUP=0 으로 비활성화)
+    if os.getenv("AI_MODEL_WARMUP", "1") != "0":
+        await asyncio.get_running_loop().run_in_executor(None, analysis.warmup_models)
+    # 동시 요청 마이크로 배칭 (AI_MICRO_BATCHING=0 으로 비활성화)
+    if os.getenv("AI_MICRO_BATCHING", "1") != "0":
+        analysis.inference_batcher.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await analysis.inference_batcher.stop()
+    analysis.shutdown_mel_pool()
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """
+    /system/models, /system/cache 는 AI_METRICS_TOKEN 이 설정된 경우에만 열리며
+    Authorization: Bearer <AI_METRICS_TOKEN> 헤더가 필요합니다. (미설정 시 404)
+    """
+    token = os.getenv("AI_METRICS_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+@app.get("/system/models", dependencies=[Depends(require_metrics_token)])
+def model_status():
+    """로드된 모델의 상태(로드 시간, 메모리 증가량, 재로딩 횟수 등)"""
+    return {
+        "success": True,
+        "models": analysis.model_status(),
+        "batcher": analysis.inference_batcher.status(),
+    }
+
+@app.get("/system/cache", dependencies=[Depends(require_metrics_token)])
+def cache_status():
+    """멜/점수 캐시 적중 통계 (중복 분석을 얼마나 건너뛰었는지)"""
+    return {"success": True, "cache": analysis.feature_cache.status()}
+
 @app.post("/system/voice-analysis")
 async def upload_voiceFile(
     files: Optional[List[UploadFile]] = File(None),
     callId: Optional[str] = Form(None),
-    mel_pick: Optional[str] = Form(None)
+    mel_pick: Optional[str] = Form(None),
+    preview: bool = Form(True)
 ):
     """
     Accepts up to 3 wav files as multipart/form-data under field name 'files'.
     Saves them to ./voice-files/{callId} and runs analysis over that folder.
     If no files are provided, expects that ./voice-files/{callId} already exists.
+    A preview JPEG is written only for the selected mel (preview=false skips it).
     """
     call_id = callId or f"call-{uuid.uuid4().hex[:8]}"
     base_path = os.path.join("voice-files", call_id)
+    created = not os.path.isdir(base_path)
     os.makedirs(base_path, exist_ok=True)
 
     saved = []
     if files:
+        max_file = int(float(os.getenv("AI_MAX_FILE_MB", "20")) * 1024 * 1024)
         for i, up in enumerate(files[:3], start=1):
-            name = up.filename or f"answer{i}.wav"
+            name = os.path.basename(up.filename or f"answer{i}.wav")
             dest = os.path.join(base_path, name)
+            # 청크 단위로 디스크에 기록 (파일 전체를 메모리에 올리지 않음)
+            written = 0
             with open(dest, "wb") as f:
-                f.write(await up.read())
+                while chunk := await up.read(UPLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > max_file:
+                        break
+                    f.write(chunk)
+            if written > max_file:
+                # 이번 요청이 만든 폴더면 앞서 저장한 파일까지 통째로 정리
+                if created:
+                    shutil.rmtree(base_path, ignore_errors=True)
+                else:
+                    for path in set(saved + [dest]):
+                        if os.path.exists(path):
+                            os.remove(path)
+                raise HTTPException(status_code=413, detail=f"파일 크기가 너무 큽니다: {name}")
             saved.append(dest)
 
-    result = await analysis.main(base_path, mel_pick=mel_pick)
+    result = await analysis.main(base_path, mel_pick=mel_pick, preview=preview)
     if not result.get("success"):
         return result
 
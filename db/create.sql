@@ -35,6 +35,7 @@ CREATE TABLE dependents (
   preferred_call_time  TIME NULL,
   retry_count          INT NOT NULL DEFAULT 3,
   retry_interval_min   INT NOT NULL DEFAULT 840,
+  last_mel_image_key   VARCHAR(80) NULL,
   created_at           DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
   updated_at           DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   deleted_at           DATETIME(6) NULL,
@@ -107,8 +108,45 @@ CREATE TABLE analyses (
   model_version  VARCHAR(64) NOT NULL,
   reasoning      JSON NULL,
   graph_points   JSON NULL,
+  mel_image_key  VARCHAR(80) NULL,
   created_at     DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
   CONSTRAINT fk_an_call FOREIGN KEY (call_id) REFERENCES calls(id) ON DELETE CASCADE,
   INDEX idx_an_state (state),
-  INDEX idx_an_model (model_version)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
\ No newline at end of file
+  INDEX idx_an_model (model_version),
+  INDEX ix_analyses_mel_image_key (mel_image_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TABLE IF EXISTS analysis_daily_rollups;
+CREATE TABLE analysis_daily_rollups (
+  id             BIGINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+  dependent_id   BIGINT UNSIGNED NOT NULL,
+  day            DATE NOT NULL,
+  count          INT NOT NULL DEFAULT 0,
+  state_sum      DOUBLE NOT NULL DEFAULT 0,
+  state_min      DOUBLE NOT NULL,
+  state_max      DOUBLE NOT NULL,
+  CONSTRAINT fk_ar_dep FOREIGN KEY (dependent_id) REFERENCES dependents(id) ON DELETE CASCADE,
+  UNIQUE KEY uq_analysis_rollups_dep_day (dependent_id, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TABLE IF EXISTS analysis_jobs;
+CREATE TABLE analysis_jobs (
+  id               BIGINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+  dependent_id     BIGINT UNSIGNED NOT NULL,
+  voice_session_id BIGINT UNSIGNED NULL,
+  status           ENUM('QUEUED','RUNNING','DONE','FAILED') NOT NULL DEFAULT 'QUEUED',
+  audio_dir        VARCHAR(512) NOT NULL,
+  attempts         INT NOT NULL DEFAULT 0,
+  score            DOUBLE NULL,
+  message          TEXT NULL,
+  analysis_id      BIGINT UNSIGNED NULL,
+  created_at       DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  started_at       DATETIME(6) NULL,
+  finished_at      DATETIME(6) NULL,
+  updated_at       DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+  CONSTRAINT fk_aj_dep      FOREIGN KEY (dependent_id)     REFERENCES dependents(id)     ON DELETE CASCADE,
+  CONSTRAINT fk_aj_vs       FOREIGN KEY (voice_session_id) REFERENCES voice_sessions(id) ON DELETE SET NULL,
+  CONSTRAINT fk_aj_analysis FOREIGN KEY (analysis_id)      REFERENCES analyses(id)       ON DELETE SET NULL,
+  INDEX ix_analysis_jobs_status_id (status, id),
+  INDEX idx_aj_dependent (dependent_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -205,14 +205,28 @@ class _CallingScreenState extends State<CallingScreen> {
 
     if (!mounted) return;
 
-    if (result['status'] == 200 && result['data']?['success'] == true) {
-      final score = result['data']['score'];
-      _analysisScore = score is num ? score.toDouble() : null;
-
-      // 세션 종료
+    final jobId = result['data']?['job_id'];
+    if (result['status'] == 200 && jobId is int) {
+      // 업로드가 끝나면 세션 종료 (분석 작업은 세션과 무관하게 진행)
       await _sessionService.endSession(sessionId: _sessionId!);
       _sessionId = null;
 
+      // 분석 작업 완료까지 폴링
+      final job = await _sessionService.waitForAnalysis(jobId: jobId);
+      if (!mounted) return;
+
+      final jobData = job['data'];
+      if (jobData?['status'] == 'FAILED') {
+        _showResultAndReturn(
+          success: false,
+          message: "분석에 실패했습니다.",
+        );
+        return;
+      }
+
+      // 제한 시간 안에 끝나지 않았으면 점수 없이 완료 처리 (결과는 서버에 저장됨)
+      final score = jobData?['score'];
+      _analysisScore = score is num ? score.toDouble() : null;
       _showResultAndReturn(
         success: true,
         score: _analysisScore,
@@ -173,8 +173,8 @@ class VoiceSessionService {
     return downloadedFiles;
   }
 
-  /// 녹음된 답변 업로드
-  /// POST /voice/sessions/{session_id}/answer (multipart)
+  /// 녹음된 답변 업로드 (분석은 서버에서 백그라운드 작업으로 진행)
+  /// POST /voice/sessions/{session_id}/answer (multipart) → { job_id, status }
   Future<Map<String, dynamic>> uploadAnswers({
     required int sessionId,
     required List<File> answerFiles,
@@ -225,6 +225,59 @@ class VoiceSessionService {
     }
   }
 
+  /// 분석 작업 상태 조회
+  /// GET /voice/jobs/{job_id}
+  Future<Map<String, dynamic>> getAnalysisJob({required int jobId}) async {
+    try {
+      final resp = await _client.get(
+        "/voice/jobs/$jobId",
+        useAuth: true,
+      );
+
+      if (resp.statusCode == 200) {
+        final data = json.decode(resp.body) as Map<String, dynamic>;
+        return {
+          "status": 200,
+          "message": "job fetched",
+          "data": data,
+        };
+      } else {
+        return {
+          "status": resp.statusCode,
+          "message": "failed to get job: ${resp.body}",
+        };
+      }
+    } catch (e) {
+      return {
+        "status": 0,
+        "message": "error: $e",
+        "userMessage": "분석 결과를 불러올 수 없습니다.",
+      };
+    }
+  }
+
+  /// 분석 작업이 끝날 때까지(DONE/FAILED) 폴링
+  /// 제한 시간 안에 끝나지 않으면 마지막 조회 결과를 그대로 반환 (data.status 가 QUEUED/RUNNING)
+  Future<Map<String, dynamic>> waitForAnalysis({
+    required int jobId,
+    Duration interval = const Duration(seconds: 2),
+    Duration timeout = const Duration(minutes: 3),
+  }) async {
+    final deadline = DateTime.now().add(timeout);
+    while (true) {
+      final result = await getAnalysisJob(jobId: jobId);
+      final jobStatus = result['data']?['status'];
+      if (result['status'] == 200 && (jobStatus == 'DONE' || jobStatus == 'FAILED')) {
+        return result;
+      }
+      // 일시적인 조회 실패는 제한 시간까지 재시도
+      if (DateTime.now().add(interval).isAfter(deadline)) {
+        return result;
+      }
+      await Future.delayed(interval);
+    }
+  }
+
   /// 세션 종료
   /// DELETE /voice/sessions/{session_id}
   Future<Map<String, dynamic>> endSession({required int sessionId}) async {
@@ -1,15 +1,25 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.database import SessionLocal, async_session_scope
 from app.core.security import decode_token
 from app.models.user import User
 from app.models.dependent import Dependent
+from app.services.principals import resolve_user, resolve_dependent
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 def get_db():
     db = SessionLocal()
     try: yield db
     finally: db.close()
+async def get_async_db():
+    """
+    AsyncSession when DB_ASYNC is on; otherwise a sync Session whose calls run in worker threads.
+    Both expose the same awaitable API (execute/scalar/get/commit/refresh/run_sync).
+    """
+    async with async_session_scope() as db:
+        yield db
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     payload = decode_token(token)
     if not payload or "sub" not in payload:
@@ -19,7 +29,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         user_id = int(str(sub))
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = resolve_user(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive or missing user")
     return user
@@ -28,6 +38,19 @@ def require_caregiver(user: User = Depends(get_current_user)) -> User:
         raise HTTPException(status_code=403, detail="Caregiver role required")
     return user
 
+def require_admin(user: User = Depends(get_current_user)) -> User:
+    if user.role != "ADMIN":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return user
+
+def require_metrics_access(token: str | None = Depends(optional_oauth2_scheme), db: Session = Depends(get_db)) -> None:
+    """/system metrics: ADMIN token required unless SYSTEM_METRICS_PUBLIC is set."""
+    if settings.system_metrics_public:
+        return
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    require_admin(get_current_user(token, db))
+
 def get_current_dependent(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Dependent:
     payload = decode_token(token)
     if not payload or "sub" not in payload:
@@ -39,7 +62,7 @@ def get_current_dependent(token: str = Depends(oauth2_scheme), db: Session = Dep
         dep_id = int(sub.split(":", 1)[1])
     except (ValueError, IndexError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    dep = db.query(Dependent).filter(Dependent.id == dep_id).first()
+    dep = resolve_dependent(db, dep_id)
     if not dep:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Dependent not found")
     return dep
@@ -1,27 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.api.deps import get_db, require_caregiver
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import select
+import os
+from app.api.deps import get_async_db, require_caregiver
 from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
 from app.models.dependent import Dependent
 from app.schemas.analyses import LatestAnalysisOut, AnalysisOut
-from datetime import datetime
+from app.schemas.voice import AnalysisJobOut
+from app.services.images import image_path, image_url, is_valid_key
+from app.services.trends import trend_series
+from datetime import date, datetime, time, timedelta
 
 router = APIRouter()
+
+async def _owned_dependent(db, dep_id: int, user_id: int, *columns):
+    """Caregiver-owned dependent (only the given columns if any), else 404."""
+    stmt = select(*columns) if columns else select(Dependent)
+    row = (await db.execute(
+        stmt.where(Dependent.id == dep_id, Dependent.caregiver_id == user_id).limit(1)
+    )).first()
+    if not row: raise HTTPException(404, "Dependent not found")
+    return row if columns else row[0]
+
 @router.get("/{dep_id}/analyses/latest", response_model=LatestAnalysisOut)
-def latest(dep_id: int, db: Session = Depends(get_db), user=Depends(require_caregiver)):
-    dep = db.query(Dependent).filter(Dependent.id == dep_id, Dependent.caregiver_id == user.id).first()
-    if not dep: raise HTTPException(404, "Dependent not found")
-    a = db.query(Analysis).filter(Analysis.dependent_id == dep.id).order_by(Analysis.id.desc()).first()
+async def latest(dep_id: int, db=Depends(get_async_db), user=Depends(require_caregiver)):
+    dep = await _owned_dependent(db, dep_id, user.id, Dependent.id, Dependent.last_mel_image_key)
+    a = await db.scalar(
+        select(Analysis).where(Analysis.dependent_id == dep.id).order_by(Analysis.id.desc()).limit(1)
+    )
     if not a:
-        return LatestAnalysisOut(state=-1.0, risk_score=None, created_at=datetime.utcnow().isoformat(), mel_image=dep.last_mel_image)
-    return LatestAnalysisOut(state=float(a.state), risk_score=a.risk_score, created_at=a.created_at.isoformat(), mel_image=a.mel_image)
+        return LatestAnalysisOut(state=-1.0, risk_score=None, created_at=datetime.utcnow().isoformat(), mel_image_url=image_url(dep.id, dep.last_mel_image_key))
+    return LatestAnalysisOut(state=float(a.state), risk_score=a.risk_score, created_at=a.created_at.isoformat(), mel_image_url=image_url(dep.id, a.mel_image_key))
+
+HISTORY_PAGE_DEFAULT = 50
+HISTORY_PAGE_MAX = 200
 
 @router.get("/{dep_id}/analyses/history", response_model=dict)
-def history(dep_id: int, db: Session = Depends(get_db), user=Depends(require_caregiver)):
-    dep = db.query(Dependent).filter(Dependent.id == dep_id, Dependent.caregiver_id == user.id).first()
-    if not dep: raise HTTPException(404, "Dependent not found")
-    items = db.query(Analysis).filter(Analysis.dependent_id == dep.id).order_by(Analysis.id.desc()).all()
-    return {"analyses": [
-        AnalysisOut(state=float(i.state), risk_score=i.risk_score, created_at=i.created_at.isoformat(), mel_image=i.mel_image).model_dump()
-        for i in items
+async def history(
+    dep_id: int,
+    cursor: int | None = None,
+    limit: int = HISTORY_PAGE_DEFAULT,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    include_images: bool = True,
+    db=Depends(get_async_db),
+    user=Depends(require_caregiver)
+):
+    """
+    Newest-first history, keyset-paginated by analysis id.
+    Pass next_cursor from the previous page as cursor; next_cursor is null on the last page.
+    date_from/date_to (YYYY-MM-DD, inclusive) filter on created_at.
+    """
+    await _owned_dependent(db, dep_id, user.id, Dependent.id)
+    limit = max(1, min(limit, HISTORY_PAGE_MAX))
+
+    # Select only the returned columns (no JSON/Text payloads)
+    columns = [Analysis.id, Analysis.state, Analysis.risk_score, Analysis.created_at]
+    if include_images:
+        columns.append(Analysis.mel_image_key)
+    q = select(*columns).where(Analysis.dependent_id == dep_id)
+    if cursor is not None:
+        q = q.where(Analysis.id < cursor)
+    if date_from is not None:
+        q = q.where(Analysis.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        q = q.where(Analysis.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    rows = (await db.execute(q.order_by(Analysis.id.desc()).limit(limit + 1))).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "analyses": [
+            AnalysisOut(
+                id=r.id,
+                state=float(r.state),
+                risk_score=r.risk_score,
+                created_at=r.created_at.isoformat(),
+                mel_image_url=image_url(dep_id, r.mel_image_key) if include_images else None
+            ).model_dump()
+            for r in rows
+        ],
+        "next_cursor": rows[-1].id if has_more else None,
+    }
+
+@router.get("/{dep_id}/analyses/trend", response_model=dict)
+async def trend(
+    dep_id: int,
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    points: int | None = Query(None, ge=3, le=1000),
+    db=Depends(get_async_db),
+    user=Depends(require_caregiver)
+):
+    """
+    Time-bucketed state series (mean/min/max/count) from the daily rollup table.
+    Days are local dates (CALL_TZ_OFFSET_MIN); date_from/date_to filter on them.
+    points downsamples the series with LTTB to at most that many buckets.
+    """
+    await _owned_dependent(db, dep_id, user.id, Dependent.id)
+    return await db.run_sync(
+        lambda s: trend_series(s, dep_id, bucket=bucket, date_from=date_from, date_to=date_to, points=points)
+    )
+
+@router.get("/{dep_id}/analyses/jobs", response_model=dict)
+async def jobs(dep_id: int, limit: int = 20, db=Depends(get_async_db), user=Depends(require_caregiver)):
+    dep = await _owned_dependent(db, dep_id, user.id, Dependent.id)
+    items = (await db.execute(
+        select(AnalysisJob)
+        .where(AnalysisJob.dependent_id == dep.id)
+        .order_by(AnalysisJob.id.desc())
+        .limit(max(1, min(limit, 100)))
+    )).scalars().all()
+    return {"jobs": [
+        AnalysisJobOut(job_id=j.id, status=j.status, score=j.score, message=j.message, created_at=j.created_at, finished_at=j.finished_at).model_dump()
+        for j in items
     ]}
+
+
+# Images are content-addressed, so a given URL never changes content
+MEL_IMAGE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+@router.get("/{dep_id}/mel-images/{key}")
+async def mel_image(dep_id: int, key: str, request: Request, db=Depends(get_async_db), user=Depends(require_caregiver)):
+    if not is_valid_key(key): raise HTTPException(404, "Image not found")
+    dep = await _owned_dependent(db, dep_id, user.id, Dependent.id, Dependent.last_mel_image_key)
+    owned = dep.last_mel_image_key == key or await db.scalar(
+        select(Analysis.id).where(Analysis.mel_image_key == key, Analysis.dependent_id == dep.id).limit(1)
+    ) is not None
+    path = image_path(key)
+    if not owned or not os.path.exists(path): raise HTTPException(404, "Image not found")
+
+    etag = f'"{key.split(".", 1)[0]}"'
+    headers = {"ETag": etag, "Cache-Control": MEL_IMAGE_CACHE_CONTROL}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    media_type = "image/png" if key.endswith(".png") else "image/jpeg"
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -1,28 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from app.api.deps import get_async_db, get_current_user
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse, MeResponse
 from app.models.user import User
-from app.core.security import get_password_hash, verify_password, create_access_token, check_password_strength
+from app.core.security import create_access_token, check_password_strength
+from app.services.passwords import hash_password, check_password, PasswordHashBusy
 
 router = APIRouter()
 
+def _hash_keys(request: Request, email: str) -> list[str]:
+    """
+    Concurrency-guard keys for bcrypt work: client IP and normalized email.
+    request.client is the peer address; behind a reverse proxy it is only the real client
+    when uvicorn runs with --proxy-headers and --forwarded-allow-ips set to the proxy's address
+    (otherwise every caller shares the proxy's IP key).
+    """
+    host = request.client.host if request.client else None
+    return [f"ip:{host}" if host else "", f"email:{email.strip().lower()}"]
+
+def _busy(e: PasswordHashBusy) -> HTTPException:
+    return HTTPException(status.HTTP_429_TOO_MANY_REQUESTS, str(e), headers={"Retry-After": "1"})
+
 @router.post("/signup", response_model=dict)
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == data.email).first():
+async def signup(data: SignupRequest, request: Request, db=Depends(get_async_db)):
+    if await db.scalar(select(User.id).where(User.email == data.email).limit(1)) is not None:
         raise HTTPException(400, "Email already registered")
     try:
         check_password_strength(data.password)
     except ValueError as e:
         raise HTTPException(400, str(e))
-    user = User(name=data.name, email=data.email, password_hash=get_password_hash(data.password), phone=data.phone, role="CAREGIVER")
-    db.add(user); db.commit(); db.refresh(user)
+    try:
+        password_hash = await hash_password(data.password, keys=_hash_keys(request, data.email))
+    except PasswordHashBusy as e:
+        raise _busy(e)
+    user = User(name=data.name, email=data.email, password_hash=password_hash, phone=data.phone, role="CAREGIVER")
+    db.add(user); await db.commit(); await db.refresh(user)
     return {"success": True, "user_id": user.id}
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, request: Request, db=Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == data.email).limit(1))
+    try:
+        ok = bool(user) and await check_password(data.password, user.password_hash, keys=_hash_keys(request, data.email))
+    except PasswordHashBusy as e:
+        raise _busy(e)
+    if not ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token(str(user.id))
     return TokenResponse(access_token=token)
@@ -3,11 +3,17 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_db, require_caregiver
 from app.models.dependent import Dependent
 from app.models.user import User
-from app.schemas.dependent import DependentCreate, DependentUpdate, DependentOut
+from app.schemas.dependent import DependentCreate, DependentUpdate, DependentOut, DependentWithImageOut, DependentDetailOut
+from app.services.images import image_url
+from app.services.call_scheduler import schedule_dependent, unschedule_dependent
 
 router = APIRouter()
 
 
+def _dependent_out(dep: Dependent, include_image: bool) -> DependentOut:
+    return (DependentWithImageOut if include_image else DependentOut).model_validate(dep)
+
+
 @router.post("", response_model=DependentOut)
 def create_dependent(
     payload: DependentCreate,
@@ -26,22 +32,23 @@ def create_dependent(
     db.add(dep)
     db.commit()
     db.refresh(dep)
+    schedule_dependent(dep.id, dep.preferred_call_time)
     return dep
 
 
 @router.get("", response_model=dict)
-def list_dependents(db: Session = Depends(get_db), user: User = Depends(require_caregiver)):
+def list_dependents(include_image: bool = False, db: Session = Depends(get_db), user: User = Depends(require_caregiver)):
     deps = (
         db.query(Dependent)
         .filter(Dependent.caregiver_id == user.id, Dependent.deleted_at.is_(None))
         .order_by(Dependent.id.desc())
         .all()
     )
-    return {"dependents": [DependentOut.model_validate(d) for d in deps]}
+    return {"dependents": [_dependent_out(d, include_image) for d in deps]}
 
 
-@router.get("/{dep_id}", response_model=DependentOut)
-def get_dependent(dep_id: int, db: Session = Depends(get_db), user: User = Depends(require_caregiver)):
+@router.get("/{dep_id}", response_model=DependentDetailOut, response_model_exclude_unset=True)
+def get_dependent(dep_id: int, include_image: bool = False, db: Session = Depends(get_db), user: User = Depends(require_caregiver)):
     dep = (
         db.query(Dependent)
         .filter(Dependent.id == dep_id, Dependent.caregiver_id == user.id)
@@ -49,7 +56,10 @@ def get_dependent(dep_id: int, db: Session = Depends(get_db), user: User = Depen
     )
     if not dep:
         raise HTTPException(404, "Dependent not found")
-    return dep
+    out = DependentDetailOut.model_validate(dep)
+    if include_image:
+        out.last_mel_image_url = image_url(dep.id, dep.last_mel_image_key)
+    return out
 
 
 @router.put("/{dep_id}", response_model=dict)
@@ -67,10 +77,14 @@ def update_dependent(
     if not dep:
         raise HTTPException(404, "Dependent not found")
 
-    for k, v in payload.model_dump(exclude_none=True).items():
+    changes = payload.model_dump(exclude_none=True)
+    for k, v in changes.items():
         setattr(dep, k, v)
 
     db.commit()
+    # 통화 시각 변경 시 스케줄 갱신 (retry 설정은 다음 통화 처리 시 DB에서 다시 읽음)
+    if "preferred_call_time" in changes:
+        schedule_dependent(dep.id, changes["preferred_call_time"])
     return {"success": True}
 
 
@@ -87,4 +101,5 @@ def delete_dependent(dep_id: int, db: Session = Depends(get_db), user: User = De
     import datetime as _dt
     dep.deleted_at = _dt.datetime.utcnow()
     db.commit()
+    unschedule_dependent(dep.id)
     return {"success": True}
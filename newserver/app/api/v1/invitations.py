@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user, get_current_dependent
+import json, time
+from app.api.deps import get_db, get_async_db, get_current_user, get_current_dependent
+from app.core.config import settings
+from app.core.database import async_session_scope
 from app.models.invitation import Invitation
 from app.models.dependent import Dependent
 from app.models.user import User
 from app.utils.shorttokens import gen_code_22, gen_code_16, gen_auth_code, utcnow, plus_minutes
 from app.core.security import create_access_token  # 기존 JWT 유틸
+from app.services.invitation_events import notify_invitation, wait_for_invitation
+from app.services.call_scheduler import schedule_dependent
 
 router = APIRouter()
 
@@ -17,7 +24,7 @@ def _norm(s: str) -> str:
 
 # (1) 피보호자앱: 익명 초대 생성 (비인증)
 @router.post("/connections")
-def create_invitation(db: Session = Depends(get_db)):
+async def create_invitation(db=Depends(get_async_db)):
     # code = gen_code_16()  # 16자 원하면 사용
     code = gen_code_22()      # 권장: 22자 base64url(128-bit)
     inv = Invitation(
@@ -26,13 +33,16 @@ def create_invitation(db: Session = Depends(get_db)):
         created_at=utcnow(),
         expires_at=plus_minutes(INVITE_TTL_MIN)
     )
-    db.add(inv); db.commit()
+    db.add(inv); await db.commit()
     return {"code": code, "expires_at": inv.expires_at.isoformat()}
 
-# (2) 피보호자앱: 초대 상태 폴링 (공개 GET)
-@router.get("/connections/{code}/status")
-def get_invitation_status(code: str, db: Session = Depends(get_db)):
-    inv = db.query(Invitation).filter(Invitation.code == _norm(code)).first()
+async def _read_status(code: str) -> dict:
+    # 매 조회마다 짧은 세션 사용 (대기 중 커넥션/트랜잭션을 잡고 있지 않도록)
+    async with async_session_scope() as db:
+        inv = (await db.execute(
+            select(Invitation.status, Invitation.auth_code, Invitation.expires_at)
+            .where(Invitation.code == code).limit(1)
+        )).first()
     if not inv or inv.expires_at < utcnow():
         return {"status": "expired"}
 
@@ -41,6 +51,49 @@ def get_invitation_status(code: str, db: Session = Depends(get_db)):
         resp["auth_code"] = inv.auth_code  # 1회용 교환 코드
     return resp
 
+# (2) 피보호자앱: 초대 상태 폴링 (공개 GET)
+#     wait>0 이면 롱폴링: pending 상태가 바뀌거나 wait초가 지날 때까지 응답 보류
+@router.get("/connections/{code}/status")
+async def get_invitation_status(code: str, wait: float = Query(0, ge=0)):
+    code = _norm(code)
+    resp = await _read_status(code)
+    deadline = time.monotonic() + min(wait, settings.invitation_longpoll_max_sec)
+    while resp["status"] == "pending":
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # 같은 프로세스의 수락은 즉시 깨우고, 다른 워커의 수락은 주기적 DB 재확인으로 감지
+        await wait_for_invitation(code, min(remaining, settings.invitation_db_recheck_sec))
+        resp = await _read_status(code)
+    return resp
+
+# (2-1) 피보호자앱: 초대 상태 SSE 스트림 (공개 GET)
+#       상태가 바뀔 때마다 event: status 전송, pending 이 끝나면 스트림 종료
+@router.get("/connections/{code}/events")
+async def stream_invitation_status(code: str):
+    code = _norm(code)
+
+    async def events():
+        last = None
+        last_sent = time.monotonic()
+        while True:
+            resp = await _read_status(code)
+            if resp != last:
+                yield f"event: status\ndata: {json.dumps(resp)}\n\n"
+                last, last_sent = resp, time.monotonic()
+            if resp["status"] != "pending":
+                return
+            await wait_for_invitation(code, settings.invitation_db_recheck_sec)
+            if time.monotonic() - last_sent >= settings.invitation_sse_keepalive_sec:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # (3) 보호자앱: 초대 수락 + 피보호자 생성/재바인딩 + auth_code 발급 (JWT 필요)
 @router.post("/connections/accept")
 def accept_invitation(
@@ -88,17 +141,19 @@ def accept_invitation(
     inv.auth_code = gen_auth_code(40)  # 1회용 교환 코드
 
     db.commit()
+    schedule_dependent(dep.id, dep.preferred_call_time)  # 연결된 피보호자 통화 스케줄 등록
+    notify_invitation(code)  # 롱폴링/SSE 대기 중인 피보호자앱 깨우기
     return {"success": True, "dependent_id": dep.id}
 
 # (4) 피보호자앱: auth_code ↔ 피보호자 JWT 교환 (공개 POST)
 @router.post("/auth/dependent/exchange")
-def exchange_auth_code_for_jwt(payload: dict, db: Session = Depends(get_db)):
+async def exchange_auth_code_for_jwt(payload: dict, db=Depends(get_async_db)):
     code = _norm(payload.get("code"))
     auth_code = payload.get("auth_code")
     if not code or not auth_code:
         raise HTTPException(400, "code and auth_code required")
 
-    inv = db.query(Invitation).filter(Invitation.code == code).with_for_update().first()
+    inv = await db.scalar(select(Invitation).where(Invitation.code == code).with_for_update())
     if not inv or inv.expires_at < utcnow():
         raise HTTPException(400, "Invalid or expired code")
     if inv.status != "connected" or not inv.auth_code:
@@ -115,7 +170,8 @@ def exchange_auth_code_for_jwt(payload: dict, db: Session = Depends(get_db)):
         data={"sub": f"dependent:{inv.dependent_id}", "role": "dependent"},
         expires_delta_minutes=DEPENDENT_JWT_TTL_MIN
     )
-    db.commit()
+    await db.commit()
+    notify_invitation(code)
 
     return {
         "access_token": access_token,
@@ -1,5 +1,42 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.api.deps import require_metrics_access
+from app.services.analysis import ai_client_metrics
+from app.services.principals import principal_cache
+from app.services.passwords import password_hash_metrics
+from app.services.reaper import reaper_metrics
+from app.services.tts import tts_cache_metrics
+from app.services.questions import question_pipeline_metrics
+from app.services.personal_questions import personal_question_metrics
+from app.services.call_scheduler import call_scheduler_metrics
 router = APIRouter()
 @router.get("/health", response_model=dict)
 def health(): 
     return {"status": "ok"}
+
+@router.get("/ai-client", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def ai_client():
+    return ai_client_metrics()
+
+@router.get("/password-hash", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def password_hash():
+    return password_hash_metrics()
+
+@router.get("/reaper", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def reaper():
+    return reaper_metrics()
+
+@router.get("/tts-cache", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def tts_cache():
+    return tts_cache_metrics()
+
+@router.get("/questions", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def questions():
+    return {**question_pipeline_metrics(), "personal": personal_question_metrics()}
+
+@router.get("/call-scheduler", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def call_scheduler():
+    return call_scheduler_metrics()
+
+@router.get("/principal-cache", response_model=dict, dependencies=[Depends(require_metrics_access)])
+def principal_cache_metrics():
+    return principal_cache.metrics()
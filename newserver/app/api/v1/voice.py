@@ -1,24 +1,68 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request
 from fastapi.responses import FileResponse, Response
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
 from datetime import datetime, timedelta
-import hashlib, os
-from app.api.deps import get_db, get_current_dependent
+import hashlib, os, re
+from app.api.deps import get_async_db, get_current_dependent
 from app.core.config import settings
 from app.models.voice_session import VoiceSession
 from app.models.call import Call
 from app.models.dependent import Dependent
-from app.schemas.voice import StartSessionResponse
-from app.services.storage import ensure_dir
-from app.services.analysis import run_multi_voice_analysis
-from app.services.questions import ensure_global_questions, global_questions_dir
+from app.models.analysis_job import AnalysisJob
+from app.schemas.voice import StartSessionResponse, AnswerUploadResponse, AnalysisJobOut
+from app.services.storage import ensure_dir, save_upload_stream, UploadTooLarge
+from app.services.analysis_jobs import enqueue_analysis_job
+from app.services.questions import (
+    MULTIPART_BOUNDARY, build_question_bundle, current_question_version, ensure_global_questions, global_questions_dir,
+    kick_global_questions, question_bundle_bytes, question_paths, question_version_dir,
+)
+from app.services.personal_questions import personal_question_set, personal_version_dir
 
 router = APIRouter()
 
+QUESTION_FILE_RE = re.compile(r"^a\d+\.wav$")
+
+
+async def _open_session(db, session_id: int, dep_id: int) -> VoiceSession:
+    sess = await db.scalar(
+        select(VoiceSession).where(VoiceSession.id == session_id, VoiceSession.dependent_id == dep_id)
+    )
+    if not sess or sess.status != "OPEN" or (sess.expires_at and sess.expires_at < datetime.utcnow()):
+        raise HTTPException(404, "Session not found or closed")
+    return sess
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _question_set(dep_id: int, v: str | None = None) -> tuple[str | None, str, bool]:
+    """
+    (version, dir, personalized) of the question set to serve. A pinned v is looked up in the
+    dependent's own sets first, then the global ones; otherwise today's precomputed personal set
+    wins over the current global set.
+    """
+    if v:
+        qdir = personal_version_dir(dep_id, v)
+        if qdir:
+            return v, qdir, True
+        qdir = question_version_dir(v)
+        if qdir:
+            return v, qdir, False
+    personal = personal_question_set(dep_id)
+    if personal:
+        return personal[0], personal[1], True
+    version = current_question_version()
+    return version, question_version_dir(version) or global_questions_dir(), False
+
 
 @router.post("/sessions", response_model=StartSessionResponse)
-def start_session_for_dependent(
-    db: Session = Depends(get_db),
+async def start_session_for_dependent(
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
     token = os.urandom(24).hex()
@@ -31,11 +75,18 @@ def start_session_for_dependent(
         expires_at=datetime.utcnow() + timedelta(hours=1)
     )
     db.add(sess)
-    db.commit()
-    db.refresh(sess)
+    await db.flush()
+    # 스케줄러가 건 통화(RINGING)에 응답한 것으로 처리 → 재시도 중단
+    await db.execute(
+        update(Call)
+        .where(Call.dependent_id == dep.id, Call.status == "RINGING")
+        .values(status="CONNECTED", voice_session_id=sess.id)
+    )
+    await db.commit()
+    await db.refresh(sess)
 
-    # Prepare global questions to be available
-    ensure_global_questions()
+    # Make sure global questions are being prepared; the listing waits for them, not this request
+    kick_global_questions()
 
     return StartSessionResponse(session_id=sess.id, token=token, expires_in=3600)
 
@@ -47,164 +98,162 @@ def session_dir(session_id: int) -> str:
 
 
 @router.get("/sessions/{session_id}/question", response_model=dict)
-def get_session_questions(
+async def get_session_questions(
     session_id: int,
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
-    sess = db.query(VoiceSession).filter(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id).first()
-    if not sess or sess.status != "OPEN":
-        raise HTTPException(404, "Session not found or closed")
-    qdir = global_questions_dir()
+    await _open_session(db, session_id, dep.id)
+    # Precomputed personal set for today's call, if the scheduler already produced one
+    personal = personal_question_set(dep.id)
+    if not personal:
+        # Join the shared in-flight generation if no complete set is published yet (cold start)
+        await ensure_global_questions(timeout=settings.question_wait_sec)
+    # Resolve the version once so every listed file comes from the same complete set
+    version, qdir, personalized = _question_set(dep.id)
     count = max(1, int(getattr(settings, 'daily_questions_count', 3)))
     files = [f"a{i}.wav" for i in range(1, count + 1)]
     available = [f for f in files if os.path.exists(os.path.join(qdir, f))]
+    suffix = f"?v={version}" if version else ""
     return {
-        "files": [{"name": f, "url": f"/voice/sessions/{session_id}/question/{f}"} for f in available]
+        "version": version,
+        "personalized": personalized,
+        "files": [{"name": f, "url": f"/voice/sessions/{session_id}/question/{f}{suffix}"} for f in available]
     }
 
 
-@router.get("/sessions/{session_id}/question/{filename}")
-def download_session_question(
+# Registered before /question/{filename} so "files" is not captured as a filename
+@router.get("/sessions/{session_id}/question/files")
+async def download_session_questions_as_formdata(
     session_id: int,
-    filename: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
-    sess = db.query(VoiceSession).filter(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id).first()
-    if not sess or sess.status != "OPEN":
-        raise HTTPException(404, "Session not found or closed")
-    qdir = global_questions_dir()
-    path = os.path.join(qdir, filename)
-    if not os.path.exists(path):
-        raise HTTPException(404, "File not found")
-    return FileResponse(path, media_type="audio/wav", filename=filename)
+    """
+    Returns the available question WAV files (a1..aN.wav) as a multipart/form-data response.
+    Each part has Content-Disposition: form-data; name="file"; filename="a{i}.wav".
+    The body is precomposed once per question-set version and sent from disk; ETag is the version.
+    """
+    await _open_session(db, session_id, dep.id)
+    version, qdir, _ = _question_set(dep.id)
+    if not any(os.path.exists(p) for p in question_paths(qdir)):
+        raise HTTPException(404, "No question files available")
 
+    media_type = f"multipart/form-data; boundary={MULTIPART_BOUNDARY}"
+    if not version:
+        body = await run_in_threadpool(question_bundle_bytes, qdir)
+        return Response(content=body, media_type=media_type)
 
-@router.get("/sessions/{session_id}/question/files")
-def download_session_questions_as_formdata(
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Question-Version": version}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    path = await run_in_threadpool(build_question_bundle, qdir)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.get("/sessions/{session_id}/question/{filename}")
+async def download_session_question(
     session_id: int,
-    db: Session = Depends(get_db),
+    filename: str,
+    request: Request,
+    v: str | None = None,
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
     """
-    Returns the available question WAV files (a1..aN.wav) as a multipart/form-data response.
-    Each part has Content-Disposition: form-data; name="file"; filename="a{i}.wav".
+    Question WAV with a strong ETag per (version, file). A URL pinned to its version (?v=) never
+    changes and is cacheable for QUESTION_AUDIO_MAX_AGE_SEC; otherwise clients revalidate.
+    Range / If-Range requests are answered with 206 partial content.
     """
-    sess = db.query(VoiceSession).filter(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id).first()
-    if not sess or sess.status != "OPEN":
-        raise HTTPException(404, "Session not found or closed")
-    qdir = global_questions_dir()
-    count = max(1, int(getattr(settings, 'daily_questions_count', 3)))
-    files = [f"a{i}.wav" for i in range(1, count + 1)]
-    available = [f for f in files if os.path.exists(os.path.join(qdir, f))]
-    if not available:
-        raise HTTPException(404, "No question files available")
+    if not QUESTION_FILE_RE.match(filename):
+        raise HTTPException(404, "File not found")
+    await _open_session(db, session_id, dep.id)
+    # v pins the version from the listing (kept until pruned); otherwise serve the current set
+    version, qdir, _ = _question_set(dep.id, v)
+    path = os.path.join(qdir, filename)
+    if not os.path.exists(path):
+        raise HTTPException(404, "File not found")
+    if not version:
+        return FileResponse(path, media_type="audio/wav", filename=filename)
+
+    etag = f'"{version}-{filename}"'
+    cache_control = (
+        f"private, max-age={settings.question_audio_max_age_sec}, immutable" if v == version else "private, no-cache"
+    )
+    headers = {"ETag": etag, "Cache-Control": cache_control, "X-Question-Version": version}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="audio/wav", filename=filename, headers=headers)
+
 
-    boundary = "----memoryon-boundary"
-    chunks: list[bytes] = []
-    for fname in available:
-        path = os.path.join(qdir, fname)
-        header = (
-            f"--{boundary}\r\n"
-            f"Content-Disposition: form-data; name=\"file\"; filename=\"{fname}\"\r\n"
-            f"Content-Type: audio/wav\r\n\r\n"
-        ).encode("utf-8")
-        with open(path, "rb") as f:
-            data = f.read()
-        chunks.append(header + data + b"\r\n")
-    chunks.append(f"--{boundary}--\r\n".encode("utf-8"))
-    body = b"".join(chunks)
-    return Response(content=body, media_type=f"multipart/form-data; boundary={boundary}")
-
-
-@router.post("/sessions/{session_id}/answer", response_model=dict)
+@router.post("/sessions/{session_id}/answer", response_model=AnswerUploadResponse)
 async def upload_answers(
     session_id: int,
     files: list[UploadFile] = File(...),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
-    sess = db.query(VoiceSession).filter(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id).first()
-    if not sess or sess.status != "OPEN":
-        raise HTTPException(404, "Session not found or closed")
+    """
+    Persists the answer WAVs and enqueues a background analysis job.
+    Poll GET /voice/jobs/{job_id} for the status and final score.
+    """
+    sess = await _open_session(db, session_id, dep.id)
 
     # Persist files under MEDIA_ROOT/call-{session}-{rand} so external service can read voice-files/{callId}
     import uuid, shutil
     call_id = f"call-{session_id}-{uuid.uuid4().hex[:8]}"
     base_dir = os.path.join(settings.media_root, call_id)
     ensure_dir(base_dir)
+    max_file = int(settings.answer_max_file_mb * 1024 * 1024)
+    remaining = int(settings.answer_max_request_mb * 1024 * 1024)
     try:
+        # Stream each upload to disk in chunks (off the event loop), enforcing per-file/per-request limits
         for i, upload in enumerate(files[:3], start=1):
             fp = os.path.join(base_dir, f"answer{i}.wav")
-            with open(fp, "wb") as f:
-                f.write(upload.file.read())
-        # Call analysis (external service or local fallback)
-        analysis_json = await run_multi_voice_analysis(base_dir)
-    finally:
-        # Clean up uploaded files after analysis attempt
-        try:
-            shutil.rmtree(base_dir)
-        except Exception:
-            pass
-    score: float | None = None
-    if analysis_json and analysis_json.get("success"):
-        # Accept either top-level score or nested under result
-        raw = None
-        if "score" in analysis_json:
-            raw = analysis_json.get("score")
-        elif isinstance(analysis_json.get("result"), dict):
-            raw = analysis_json["result"].get("score")
-        try:
-            if raw is not None:
-                score = float(raw)
-        except Exception:
-            score = None
-
-    if score is not None:
-        # Encode mel image (if provided) and update dependent
-        mel_b64 = None
-        import base64
-        mel_path = analysis_json.get("mel_path") if isinstance(analysis_json, dict) else None
-        if mel_path and os.path.exists(mel_path):
-            try:
-                with open(mel_path, "rb") as f:
-                    mel_b64 = base64.b64encode(f.read()).decode("ascii")
-            except Exception:
-                mel_b64 = None
-
-        dep.last_state = score
-        dep.last_exam_at = datetime.utcnow()
-        if mel_b64:
-            dep.last_mel_image = mel_b64
-        db.add(dep)
-
-        # Persist analysis history record without audio
-        from app.models.analysis import Analysis
-        an = Analysis(
-            dependent_id=dep.id,
-            call_id=None,
-            state=score,
-            risk_score=score,
-            model_version="v1",
-            mel_image=mel_b64
-        )
-        db.add(an)
-        db.commit()
-        return {"success": True, "score": score}
-    else:
-        return {"success": False, "message": analysis_json.get("message") if analysis_json else "analysis failed"}
+            remaining -= await run_in_threadpool(save_upload_stream, upload, fp, min(max_file, remaining))
+        job = await enqueue_analysis_job(db, dep.id, sess.id, base_dir)
+    except UploadTooLarge as e:
+        shutil.rmtree(base_dir, ignore_errors=True)
+        raise HTTPException(413, str(e))
+    except Exception:
+        # Clean up uploaded files if the job could not be queued
+        shutil.rmtree(base_dir, ignore_errors=True)
+        raise
+    return AnswerUploadResponse(job_id=job.id, status=job.status)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobOut)
+async def get_analysis_job(
+    job_id: int,
+    db=Depends(get_async_db),
+    dep: Dependent = Depends(get_current_dependent)
+):
+    job = await db.scalar(select(AnalysisJob).where(AnalysisJob.id == job_id, AnalysisJob.dependent_id == dep.id))
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return AnalysisJobOut(
+        job_id=job.id,
+        status=job.status,
+        score=job.score,
+        message=job.message,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
 
 
 @router.delete("/sessions/{session_id}", response_model=dict)
-def end_session(
+async def end_session(
     session_id: int,
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     dep: Dependent = Depends(get_current_dependent)
 ):
-    sess = db.query(VoiceSession).filter(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id).first()
+    sess = await db.scalar(
+        select(VoiceSession).where(VoiceSession.id == session_id, VoiceSession.dependent_id == dep.id)
+    )
     if not sess:
         raise HTTPException(404, "Session not found")
     sess.status = "CLOSED"
-    db.commit()
+    await db.commit()
     return {"success": True, "message": "session closed"}
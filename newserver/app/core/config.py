@@ -8,6 +8,9 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     algorithm: str = Field(alias="ALGORITHM")
     database_url: str = Field(alias="DATABASE_URL")
+    # Async DB layer (SQLAlchemy asyncio). ASYNC_DATABASE_URL defaults to DATABASE_URL with the async driver
+    db_async: bool = Field(default=False, alias="DB_ASYNC")
+    async_database_url: str | None = Field(default=None, alias="ASYNC_DATABASE_URL")
     media_root: str = Field(alias="MEDIA_ROOT")
 
     # Gemini LLM settings (Google)
@@ -21,15 +24,86 @@ class Settings(BaseSettings):
     google_tts_language: str = Field(default="ko-KR", alias="GOOGLE_TTS_LANGUAGE")
     google_tts_voice: str = Field(default="ko-KR-Wavenet-A", alias="GOOGLE_TTS_VOICE")
     google_application_credentials: str | None = Field(default=None, alias="GOOGLE_APPLICATION_CREDENTIALS")
+    # On-disk TTS cache (defaults to MEDIA_ROOT/tts-cache), LRU-evicted beyond TTS_CACHE_MAX_MB
+    tts_cache_dir: str | None = Field(default=None, alias="TTS_CACHE_DIR")
+    tts_cache_max_mb: float = Field(default=200, alias="TTS_CACHE_MAX_MB")
 
-    # Global questions root (shared question WAVs)
+    # Global questions root (shared question WAVs, published as versioned sets)
     questions_root: str = Field(default="q", alias="QUESTIONS_ROOT")
+    questions_keep_versions: int = Field(default=2, alias="QUESTIONS_KEEP_VERSIONS")
+    question_tts_concurrency: int = Field(default=3, alias="QUESTION_TTS_CONCURRENCY")
+    question_wait_sec: float = Field(default=20.0, alias="QUESTION_WAIT_SEC")
+    # Cache lifetime of version-pinned question WAV URLs (?v=...), whose content never changes
+    question_audio_max_age_sec: int = Field(default=86400, alias="QUESTION_AUDIO_MAX_AGE_SEC")
+    # Per-dependent question sets, precomputed PERSONAL_QUESTIONS_LEAD_MIN before preferred_call_time
+    personal_questions_enabled: bool = Field(default=True, alias="PERSONAL_QUESTIONS_ENABLED")
+    personal_questions_lead_min: int = Field(default=120, alias="PERSONAL_QUESTIONS_LEAD_MIN")
+    personal_questions_scan_min: float = Field(default=5.0, alias="PERSONAL_QUESTIONS_SCAN_MIN")
+    personal_questions_batch_size: int = Field(default=10, alias="PERSONAL_QUESTIONS_BATCH_SIZE")
+    personal_questions_max_per_run: int = Field(default=200, alias="PERSONAL_QUESTIONS_MAX_PER_RUN")
+    personal_questions_retention_days: int = Field(default=2, alias="PERSONAL_QUESTIONS_RETENTION_DAYS")
+    # Local timezone as an offset from UTC in minutes (KST = 540): preferred_call_time and analysis rollup days
+    call_tz_offset_min: int = Field(default=540, alias="CALL_TZ_OFFSET_MIN")
+
+    # In-process call scheduler (places Call rows at preferred_call_time and retries unanswered calls).
+    # Off by default: every worker that enables it places the same calls, so set CALL_SCHEDULER_ENABLED=true
+    # in exactly one process (e.g. a single-worker uvicorn, or one dedicated instance).
+    call_scheduler_enabled: bool = Field(default=False, alias="CALL_SCHEDULER_ENABLED")
+    call_scheduler_batch_size: int = Field(default=500, alias="CALL_SCHEDULER_BATCH_SIZE")
+    call_scheduler_max_sleep_sec: float = Field(default=60.0, alias="CALL_SCHEDULER_MAX_SLEEP_SEC")
+    # Attempt k rings for retry_interval_min * CALL_RETRY_BACKOFF^k minutes, at most CALL_RETRY_MAX_INTERVAL_MIN
+    call_retry_backoff: float = Field(default=2.0, alias="CALL_RETRY_BACKOFF")
+    call_retry_max_interval_min: float = Field(default=60.0, alias="CALL_RETRY_MAX_INTERVAL_MIN")
 
     # AI model paths (optional)
     mci_model_path: str | None = Field(default=None, alias="MCI_MODEL_PATH")
 
     # External AI service (optional)
     ai_service_url: str = Field(default="http://localhost:8001", alias="AI_SERVICE_URL")
+    ai_http_max_connections: int = Field(default=20, alias="AI_HTTP_MAX_CONNECTIONS")
+    ai_http_max_keepalive: int = Field(default=10, alias="AI_HTTP_MAX_KEEPALIVE")
+    ai_http_keepalive_expiry_sec: float = Field(default=30.0, alias="AI_HTTP_KEEPALIVE_EXPIRY_SEC")
+    ai_http_timeout_sec: float = Field(default=120.0, alias="AI_HTTP_TIMEOUT_SEC")
+    ai_http_connect_timeout_sec: float = Field(default=5.0, alias="AI_HTTP_CONNECT_TIMEOUT_SEC")
+    ai_http2: bool = Field(default=True, alias="AI_HTTP2")
+
+    # Answer upload limits (streamed to disk in chunks)
+    answer_max_file_mb: float = Field(default=20, alias="ANSWER_MAX_FILE_MB")
+    answer_max_request_mb: float = Field(default=60, alias="ANSWER_MAX_REQUEST_MB")
+    upload_chunk_kb: int = Field(default=256, alias="UPLOAD_CHUNK_KB")
+
+    # Background analysis jobs (DB-backed queue drained by in-process workers)
+    analysis_workers: int = Field(default=2, alias="ANALYSIS_WORKERS")
+    analysis_job_poll_sec: float = Field(default=2.0, alias="ANALYSIS_JOB_POLL_SEC")
+    analysis_job_max_attempts: int = Field(default=2, alias="ANALYSIS_JOB_MAX_ATTEMPTS")
+    analysis_job_stale_min: int = Field(default=10, alias="ANALYSIS_JOB_STALE_MIN")
+
+    # Maintenance reaper (expired sessions, stale invitations, orphaned media dirs; interval 0 disables)
+    reaper_interval_min: float = Field(default=10.0, alias="REAPER_INTERVAL_MIN")
+    reaper_batch_size: int = Field(default=500, alias="REAPER_BATCH_SIZE")
+    reaper_max_batches: int = Field(default=20, alias="REAPER_MAX_BATCHES")
+    reaper_batch_pause_ms: int = Field(default=100, alias="REAPER_BATCH_PAUSE_MS")
+    reaper_invitation_retention_hours: float = Field(default=24.0, alias="REAPER_INVITATION_RETENTION_HOURS")
+    reaper_media_min_age_min: float = Field(default=60.0, alias="REAPER_MEDIA_MIN_AGE_MIN")
+    reaper_media_max_dirs: int = Field(default=200, alias="REAPER_MEDIA_MAX_DIRS")
+
+    # Password hashing (bcrypt cost, dedicated executor and admission limits)
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(default=32, alias="PASSWORD_HASH_MAX_QUEUE")
+    password_hash_per_key_limit: int = Field(default=2, alias="PASSWORD_HASH_PER_KEY_LIMIT")
+
+    # Invitation status long-poll / SSE
+    invitation_longpoll_max_sec: float = Field(default=30.0, alias="INVITATION_LONGPOLL_MAX_SEC")
+    invitation_db_recheck_sec: float = Field(default=5.0, alias="INVITATION_DB_RECHECK_SEC")
+    invitation_sse_keepalive_sec: float = Field(default=15.0, alias="INVITATION_SSE_KEEPALIVE_SEC")
+
+    # /system metrics endpoints (everything except /system/health) need an ADMIN token unless this is set
+    system_metrics_public: bool = Field(default=False, alias="SYSTEM_METRICS_PUBLIC")
+
+    # Auth principal cache (resolved users/dependents per process; 0 disables)
+    principal_cache_ttl_sec: float = Field(default=30.0, alias="PRINCIPAL_CACHE_TTL_SEC")
+    principal_cache_max_items: int = Field(default=10000, alias="PRINCIPAL_CACHE_MAX_ITEMS")
 
     class Config:
         env_file = ".env"
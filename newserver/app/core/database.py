@@ -1,6 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 engine = create_engine(settings.database_url, pool_pre_ping=True, pool_recycle=3600, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 class Base(DeclarativeBase): pass
+
+# Sync driver -> asyncio driver
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(
+        settings.async_database_url or async_database_url(settings.database_url),
+        pool_pre_ping=True, pool_recycle=3600, echo=False
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Short-lived session with the get_async_db API, for code running outside a request dependency."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = ThreadedSession(SessionLocal(expire_on_commit=False))
+    try: yield db
+    finally: await db.close()
+
+
+class ThreadedSession:
+    """
+    AsyncSession-compatible facade over a sync Session; every DB round trip runs in a worker thread.
+    get_async_db hands this out when DB_ASYNC is off, so async routes never block the event loop.
+    """
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        # Buffer rows in the worker thread, like AsyncSession does (DML without RETURNING has none).
+        # Only CursorResult has returns_rows; ORM results (e.g. select(Entity)) always carry rows.
+        def _run():
+            result = self.sync_session.execute(statement, *args, **kwargs)
+            return result.freeze()() if getattr(result, "returns_rows", True) else result
+        return await asyncio.to_thread(_run)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await asyncio.to_thread(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await asyncio.to_thread(self.sync_session.get, entity, ident, **kwargs)
+
+    async def flush(self):
+        await asyncio.to_thread(self.sync_session.flush)
+
+    async def refresh(self, instance):
+        await asyncio.to_thread(self.sync_session.refresh, instance)
+
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def close(self):
+        await asyncio.to_thread(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
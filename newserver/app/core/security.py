@@ -5,7 +5,7 @@ from passlib.context import CryptContext
 from app.core.config import settings
 import re
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 def get_password_hash(password: str) -> str: return pwd_context.hash(password)
 
@@ -1,20 +1,50 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import Base, engine, async_engine
+from app.migrations.schema import upgrade_schema
+from app.core.middleware import BodySizeLimitMiddleware
 from app.api.v1 import auth, dependents, voice, analyses, system, invitations
-from app.services.questions import start_daily_question_job
+from app.services.questions import start_daily_question_job, stop_daily_question_job
+from app.services.personal_questions import start_personal_question_scheduler, stop_personal_question_scheduler
+from app.services.analysis_jobs import start_analysis_workers, stop_analysis_workers
+from app.services.analysis import start_ai_client, close_ai_client
+from app.services.passwords import shutdown_password_executor
+from app.services.reaper import start_reaper, stop_reaper
+from app.services.call_scheduler import start_call_scheduler, stop_call_scheduler
 
 app = FastAPI(title="MemoryOn API", version="1.0.0")
+# Last added is outermost: CORS wraps the size limit so early 413s still carry CORS headers
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=int(settings.answer_max_request_mb * 1024 * 1024), path_prefix="/voice/")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     # start daily question generation job
     start_daily_question_job()
+    # precompute per-dependent question sets ahead of preferred_call_time
+    start_personal_question_scheduler()
+    # shared AI service client and background analysis workers
+    start_ai_client()
+    start_analysis_workers()
+    start_reaper()
+    # rebuild the call schedule from preferred_call_time and place/retry calls in-process
+    start_call_scheduler()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await stop_reaper()
+    await stop_call_scheduler()
+    await stop_daily_question_job()
+    await stop_personal_question_scheduler()
+    await stop_analysis_workers()
+    await close_ai_client()
+    shutdown_password_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-start_daily_question_job()
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(dependents.router, prefix="/dependents", tags=["Dependents"])
 app.include_router(voice.router, prefix="/voice", tags=["Voice Sessions"])
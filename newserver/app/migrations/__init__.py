@@ -0,0 +1 @@
+# pkg
\ No newline at end of file
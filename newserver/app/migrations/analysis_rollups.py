@@ -0,0 +1,31 @@
+"""
+Rebuild analysis_daily_rollups from the analyses table (backfill for data written before rollups existed).
+
+Usage: python -m app.migrations.analysis_rollups
+"""
+from app.core.database import Base, SessionLocal, engine
+from app.models.analysis import Analysis
+from app.models.analysis_rollup import AnalysisDailyRollup
+from app.services.trends import rebuild_rollups
+
+
+def rebuild_all() -> dict:
+    Base.metadata.create_all(bind=engine, tables=[AnalysisDailyRollup.__table__])
+    db = SessionLocal()
+    try:
+        dep_ids = [r[0] for r in db.query(Analysis.dependent_id).distinct().all()]
+    finally:
+        db.close()
+    rows = 0
+    for dep_id in dep_ids:
+        db = SessionLocal()
+        try:
+            rows += rebuild_rollups(db, dep_id)
+            db.commit()
+        finally:
+            db.close()
+    return {"dependents": len(dep_ids), "rollup_rows": rows}
+
+
+if __name__ == "__main__":
+    print(rebuild_all())
@@ -0,0 +1,62 @@
+"""
+Move base64 mel images out of analyses.mel_image / dependents.last_mel_image into the image store
+(MEDIA_ROOT/images), leaving only the key in mel_image_key / last_mel_image_key.
+
+Usage: python -m app.migrations.mel_image_store [--batch 200]
+"""
+import argparse
+import base64
+from app.core.database import SessionLocal
+from app.migrations.schema import upgrade_schema
+from app.models.analysis import Analysis
+from app.models.dependent import Dependent
+from app.services.images import store_image_bytes
+
+def _to_key(b64: str) -> str | None:
+    try:
+        return store_image_bytes(base64.b64decode(b64, validate=False))
+    except Exception:
+        return None
+
+
+def _migrate(model, id_col, b64_col, key_col, batch_size: int) -> int:
+    moved = 0
+    last_id = 0
+    while True:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(id_col, b64_col)
+                .filter(id_col > last_id, b64_col.isnot(None))
+                .order_by(id_col)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return moved
+            for row_id, b64 in rows:
+                key = _to_key(b64)
+                values = {b64_col: None}
+                if key:
+                    values[key_col] = key
+                    moved += 1
+                db.query(model).filter(id_col == row_id).update(values, synchronize_session=False)
+            db.commit()
+            last_id = rows[-1][0]
+        finally:
+            db.close()
+
+
+def migrate_images(batch_size: int = 200) -> dict:
+    upgrade_schema()
+    return {
+        "analyses": _migrate(Analysis, Analysis.id, Analysis.mel_image, Analysis.mel_image_key, batch_size),
+        "dependents": _migrate(Dependent, Dependent.id, Dependent.last_mel_image, Dependent.last_mel_image_key, batch_size),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+    print(migrate_images(args.batch))
@@ -0,0 +1,34 @@
+"""
+Additive schema changes for existing databases. Base.metadata.create_all only creates missing
+tables, so columns/indexes added to existing tables are applied here at startup (idempotent).
+"""
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+# (table, column, DDL type)
+NEW_COLUMNS = [
+    ("analyses", "mel_image_key", "VARCHAR(80) NULL"),
+    ("dependents", "last_mel_image_key", "VARCHAR(80) NULL"),
+]
+
+# (table, index name, columns)
+NEW_INDEXES = [
+    ("analyses", "ix_analyses_mel_image_key", ["mel_image_key"]),
+    ("analyses", "ix_analyses_dependent_id_id", ["dependent_id", "id"]),
+    ("invitations", "ix_invitations_expires_at", ["expires_at"]),
+    ("voice_sessions", "ix_voice_sessions_status_expires_at", ["status", "expires_at"]),
+    ("calls", "ix_calls_dependent_id_status", ["dependent_id", "status"]),
+    ("dependents", "ix_dependents_preferred_call_time", ["preferred_call_time"]),
+]
+
+
+def upgrade_schema(bind=engine):
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+    with bind.begin() as conn:
+        for table, column, ddl in NEW_COLUMNS:
+            if table in tables and column not in {c["name"] for c in insp.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        for table, name, columns in NEW_INDEXES:
+            if table in tables and name not in {i["name"] for i in insp.get_indexes(table)}:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, Float, DateTime, Enum, ForeignKey, Text, JSON, UniqueConstraint
+from sqlalchemy import String, Integer, Float, DateTime, Enum, ForeignKey, Text, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.core.database import Base
@@ -6,7 +6,10 @@ from app.core.database import Base
 
 class Analysis(Base):
     __tablename__ = "analyses"
-    __table_args__ = (UniqueConstraint('call_id', name='uq_analyses_call_id'),)
+    __table_args__ = (
+        UniqueConstraint('call_id', name='uq_analyses_call_id'),
+        Index("ix_analyses_dependent_id_id", "dependent_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     dependent_id: Mapped[int] = mapped_column(
@@ -21,12 +24,16 @@ class Analysis(Base):
     # 상태 점수(소수). 기본값 -1.0 (미분석)
     state: Mapped[float] = mapped_column(Float, default=-1.0)
     risk_score: Mapped[float | None] = mapped_column(Float, nullable=True)
-    graph_points: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    reasoning: Mapped[str | None] = mapped_column(Text, nullable=True)
-    diarization: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    features: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # 대용량 컬럼은 지연 로딩 (필요한 곳에서 undefer_group("payload") 로 함께 로드)
+    graph_points: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="payload")
+    reasoning: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="payload")
+    diarization: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="payload")
+    features: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="payload")
     model_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    mel_image: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # 레거시 base64 이미지 (app.migrations.mel_image_store 로 이미지 저장소로 이전)
+    mel_image: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+    # 이미지 저장소(MEDIA_ROOT/images) 키
+    mel_image_key: Mapped[str | None] = mapped_column(String(80), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     dependent = relationship("Dependent", back_populates="analyses")
@@ -0,0 +1,46 @@
+from sqlalchemy import String, Integer, Float, DateTime, Enum, ForeignKey, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import datetime
+from app.core.database import Base
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (Index("ix_analysis_jobs_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    dependent_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("dependents.id", ondelete="CASCADE"),
+        index=True
+    )
+    voice_session_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("voice_sessions.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    status: Mapped[str] = mapped_column(
+        Enum("QUEUED", "RUNNING", "DONE", "FAILED", name="analysis_job_status"),
+        default="QUEUED"
+    )
+    # 업로드된 답변 WAV 가 저장된 디렉토리 (MEDIA_ROOT/call-*), 작업 완료 시 삭제
+    audio_dir: Mapped[str] = mapped_column(String(512))
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    analysis_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("analyses.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    dependent = relationship("Dependent")
+    analysis = relationship("Analysis")
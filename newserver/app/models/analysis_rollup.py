@@ -0,0 +1,21 @@
+from sqlalchemy import Integer, Float, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date
+from app.core.database import Base
+
+
+class AnalysisDailyRollup(Base):
+    """피보호자별 일 단위 분석 점수 집계 (분석 저장 시 갱신, 추이 차트용)"""
+    __tablename__ = "analysis_daily_rollups"
+    __table_args__ = (UniqueConstraint("dependent_id", "day", name="uq_analysis_rollups_dep_day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dependent_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("dependents.id", ondelete="CASCADE")
+    )
+    day: Mapped[date] = mapped_column(Date)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    state_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    state_min: Mapped[float] = mapped_column(Float)
+    state_max: Mapped[float] = mapped_column(Float)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, Float, DateTime, Enum, ForeignKey, Text, JSON
+from sqlalchemy import String, Integer, Float, DateTime, Enum, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class Call(Base):
     __tablename__ = "calls"
+    __table_args__ = (
+        # 통화 스케줄러: 대상자별 RINGING 통화 조회용
+        Index("ix_calls_dependent_id_status", "dependent_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     dependent_id: Mapped[int] = mapped_column(
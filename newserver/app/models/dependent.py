@@ -7,6 +7,7 @@ class Dependent(Base):
     __tablename__ = "dependents"
     __table_args__ = (
         Index("ix_dependents_caregiver_deleted", "caregiver_id", "deleted_at"),
+        Index("ix_dependents_preferred_call_time", "preferred_call_time"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -33,7 +34,8 @@ class Dependent(Base):
     # 최근 분석 상태 값(부동소수, -1.0=미분석) 및 최근 검사 시각
     last_state: Mapped[float] = mapped_column(Float, default=-1.0)
     last_exam_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    last_mel_image: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_mel_image: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)  # 레거시 base64 (지연 로딩)
+    last_mel_image_key: Mapped[str | None] = mapped_column(String(80), nullable=True)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
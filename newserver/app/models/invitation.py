@@ -17,6 +17,6 @@ class Invitation(Base):
 
     created_at = Column(DateTime, nullable=False)
     connected_at = Column(DateTime, nullable=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
     dependent = relationship("Dependent", backref="invitations", lazy="joined")
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, Enum, ForeignKey, JSON
+from sqlalchemy import String, Integer, DateTime, Enum, ForeignKey, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class VoiceSession(Base):
     __tablename__ = "voice_sessions"
+    __table_args__ = (
+        # 만료 세션 정리(reaper) 조회용
+        Index("ix_voice_sessions_status_expires_at", "status", "expires_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     dependent_id: Mapped[int] = mapped_column(
@@ -2,14 +2,16 @@ from pydantic import BaseModel
 from typing import Optional
 
 # state: 부동소수(분석 점수). 미분석 시 -1.0 반환.
+# mel_image_url: 이미지 저장소 다운로드 경로 (GET /dependents/{dep_id}/mel-images/{key})
 class AnalysisOut(BaseModel):
+    id: Optional[int] = None
     state: float
     risk_score: Optional[float] = None
     created_at: str
-    mel_image: Optional[str] = None
+    mel_image_url: Optional[str] = None
 
 class LatestAnalysisOut(BaseModel):
     state: float
     risk_score: Optional[float] = None
     created_at: str
-    mel_image: Optional[str] = None
+    mel_image_url: Optional[str] = None
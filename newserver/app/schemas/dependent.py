@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from typing import Optional
 from datetime import datetime
+from app.services.images import image_url
 class DependentCreate(BaseModel):
     name: str; birth_date: Optional[str] = None; sex: Optional[str] = "U"
     preferred_call_time: Optional[str] = None; retry_count: Optional[int] = 3; retry_interval_min: Optional[int] = 10
@@ -13,6 +14,18 @@ class DependentOut(BaseModel):
     preferred_call_time: str | None = None
     last_state: float = -1.0
     last_exam_at: datetime | None = None
-    last_mel_image: str | None = None
     class Config:
         from_attributes = True
+
+# include_image=true 요청 시에만 사용 (이미지 경로 포함)
+class DependentWithImageOut(DependentOut):
+    last_mel_image_key: str | None = Field(default=None, exclude=True)
+
+    @computed_field
+    @property
+    def last_mel_image_url(self) -> str | None:
+        return image_url(self.id, self.last_mel_image_key)
+
+# GET /dependents/{id}: 이미지 경로는 include_image=true 일 때만 채워져 응답에 포함됨 (exclude_unset)
+class DependentDetailOut(DependentOut):
+    last_mel_image_url: str | None = None
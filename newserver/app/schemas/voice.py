@@ -1,3 +1,12 @@
 from pydantic import BaseModel
+from datetime import datetime
 class StartSessionRequest(BaseModel): dependent_id: int
 class StartSessionResponse(BaseModel): session_id: int; token: str; expires_in: int = 3600
+class AnswerUploadResponse(BaseModel): success: bool = True; job_id: int; status: str
+class AnalysisJobOut(BaseModel):
+    job_id: int
+    status: str
+    score: float | None = None
+    message: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
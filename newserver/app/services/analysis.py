@@ -1,8 +1,73 @@
 from typing import Dict, Any
-import os, sys
+from collections import deque
+import os, sys, time, contextlib, importlib.util
 from pathlib import Path
 from app.core.config import settings
 
+# Shared AI service client (created at app startup, reused across analyses)
+_ai_client = None
+_ai_metrics: Dict[str, Any] = {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+_ai_latencies: deque = deque(maxlen=512)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_ai_client():
+    """Return the shared httpx.AsyncClient for AI_SERVICE_URL, creating it on first use."""
+    global _ai_client
+    if _ai_client is None or _ai_client.is_closed:
+        import httpx
+        _ai_client = httpx.AsyncClient(
+            base_url=settings.ai_service_url.rstrip("/"),
+            http2=settings.ai_http2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.ai_http_max_connections,
+                max_keepalive_connections=settings.ai_http_max_keepalive,
+                keepalive_expiry=settings.ai_http_keepalive_expiry_sec,
+            ),
+            timeout=httpx.Timeout(settings.ai_http_timeout_sec, connect=settings.ai_http_connect_timeout_sec),
+        )
+    return _ai_client
+
+
+def start_ai_client():
+    if settings.ai_service_url:
+        get_ai_client()
+
+
+async def close_ai_client():
+    global _ai_client
+    if _ai_client is not None:
+        await _ai_client.aclose()
+        _ai_client = None
+
+
+def ai_client_metrics() -> Dict[str, Any]:
+    """Request latency and connection pool utilization of the shared AI service client."""
+    lat = sorted(_ai_latencies)
+
+    def pct(q: float):
+        return round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 1) if lat else None
+
+    pool: Dict[str, Any] = {"max_connections": settings.ai_http_max_connections, "open": None, "idle": None}
+    try:
+        conns = _ai_client._transport._pool.connections  # httpcore pool (best effort)
+        pool["open"] = len(conns)
+        pool["idle"] = sum(1 for c in conns if c.is_idle())
+        pool["http2"] = any(getattr(c, "_connection", None) is not None and "HTTP2" in type(c._connection).__name__ for c in conns)
+    except Exception:
+        pass
+    return {
+        **_ai_metrics,
+        "client_open": _ai_client is not None and not _ai_client.is_closed,
+        "latency_ms_p50": pct(0.5),
+        "latency_ms_p95": pct(0.95),
+        "latency_ms_max": round(lat[-1] * 1000, 1) if lat else None,
+        "pool": pool,
+    }
+
 def _import_external_analysis():
     mod = None
     try:
@@ -36,32 +101,38 @@ async def run_multi_voice_analysis(base_path: str) -> Dict[str, Any]:
     """
     # Prefer external HTTP service if configured
     if settings.ai_service_url:
+        started = time.perf_counter()
+        _ai_metrics["requests"] += 1
+        _ai_metrics["in_flight"] += 1
+        _ai_metrics["max_in_flight"] = max(_ai_metrics["max_in_flight"], _ai_metrics["in_flight"])
         try:
-            import httpx
-            url = settings.ai_service_url.rstrip("/") + "/system/voice-analysis"
+            client = get_ai_client()
             # Attach up to 3 wav files as multipart form-data with field name 'files'
-            files_list = []
-            try:
-                for name in sorted(os.listdir(base_path)):
-                    if name.lower().endswith('.wav'):
-                        fp = os.path.join(base_path, name)
-                        files_list.append(('files', (name, open(fp, 'rb'), 'audio/wav')))
-                        if len(files_list) >= 3:
-                            break
-            except FileNotFoundError:
+            with contextlib.ExitStack() as stack:
                 files_list = []
+                try:
+                    for name in sorted(os.listdir(base_path)):
+                        if name.lower().endswith('.wav'):
+                            fp = os.path.join(base_path, name)
+                            files_list.append(('files', (name, stack.enter_context(open(fp, 'rb')), 'audio/wav')))
+                            if len(files_list) >= 3:
+                                break
+                except FileNotFoundError:
+                    files_list = []
 
-            async with httpx.AsyncClient(timeout=120.0) as client:
                 if files_list:
-                    resp = await client.post(url, files=files_list)
+                    resp = await client.post("/system/voice-analysis", files=files_list)
                 else:
                     # Fallback: no local files found; still call with empty body
-                    resp = await client.post(url)
+                    resp = await client.post("/system/voice-analysis")
                 resp.raise_for_status()
                 return resp.json()
         except Exception as e:
             # Fallback to local module if HTTP call fails
-            pass
+            _ai_metrics["errors"] += 1
+        finally:
+            _ai_metrics["in_flight"] -= 1
+            _ai_latencies.append(time.perf_counter() - started)
     ext = _import_external_analysis()
     if ext is None:
         return {"success": False, "message": "analysis module not found. Place ai/analysis.py or analysis.py alongside the server process."}
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
+from app.models.dependent import Dependent
+from app.services.analysis import run_multi_voice_analysis
+from app.services.images import store_image_file
+from app.services.trends import record_analysis_rollup
+
+_loop: asyncio.AbstractEventLoop | None = None
+_wakeup: asyncio.Event | None = None
+_workers: list[asyncio.Task] = []
+
+
+def extract_score(analysis_json: Dict[str, Any] | None) -> float | None:
+    """Accept either top-level score or nested under result."""
+    if not analysis_json or not analysis_json.get("success"):
+        return None
+    raw = None
+    if "score" in analysis_json:
+        raw = analysis_json.get("score")
+    elif isinstance(analysis_json.get("result"), dict):
+        raw = analysis_json["result"].get("score")
+    try:
+        return float(raw) if raw is not None else None
+    except Exception:
+        return None
+
+
+def save_analysis_result(db: Session, dep: Dependent, score: float, analysis_json: Dict[str, Any]) -> Analysis:
+    """
+    Update the dependent's latest state and persist an Analysis history record (without audio).
+    Does not commit.
+    """
+    # Copy the mel image (if provided) into the content-addressed image store
+    mel_key = None
+    mel_path = analysis_json.get("mel_path") if isinstance(analysis_json, dict) else None
+    if mel_path and os.path.exists(mel_path):
+        mel_key = store_image_file(mel_path)
+
+    now = datetime.utcnow()
+    dep.last_state = score
+    dep.last_exam_at = now
+    if mel_key:
+        dep.last_mel_image_key = mel_key
+    db.add(dep)
+
+    an = Analysis(
+        dependent_id=dep.id,
+        call_id=None,
+        state=score,
+        risk_score=score,
+        model_version="v1",
+        mel_image_key=mel_key,
+        created_at=now
+    )
+    db.add(an)
+    record_analysis_rollup(db, dep.id, now, score)
+    return an
+
+
+async def enqueue_analysis_job(db, dependent_id: int, session_id: int | None, audio_dir: str) -> AnalysisJob:
+    """Persist a QUEUED job for the uploaded answers and wake the workers (db: session from get_async_db)."""
+    job = AnalysisJob(
+        dependent_id=dependent_id,
+        voice_session_id=session_id,
+        status="QUEUED",
+        audio_dir=audio_dir
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    notify_analysis_workers()
+    return job
+
+
+def notify_analysis_workers():
+    if _loop is not None and _wakeup is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def _fail_exhausted_jobs(db: Session, stale_before: datetime):
+    """RUNNING jobs whose worker died on their last allowed attempt are failed instead of reclaimed."""
+    exhausted = and_(
+        AnalysisJob.status == "RUNNING",
+        AnalysisJob.started_at < stale_before,
+        AnalysisJob.attempts >= settings.analysis_job_max_attempts,
+    )
+    for job_id, audio_dir in db.query(AnalysisJob.id, AnalysisJob.audio_dir).filter(exhausted).all():
+        failed = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, exhausted)
+            .update(
+                {
+                    AnalysisJob.status: "FAILED",
+                    AnalysisJob.message: "worker did not finish the job",
+                    AnalysisJob.finished_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if failed:
+            shutil.rmtree(audio_dir, ignore_errors=True)
+
+
+def _claim_next_job() -> tuple[int, int] | None:
+    """
+    Atomically move the oldest claimable job to RUNNING and return (job id, attempt number).
+    RUNNING jobs whose worker died (started before ANALYSIS_JOB_STALE_MIN) are claimable again
+    until ANALYSIS_JOB_MAX_ATTEMPTS, so jobs survive restarts; after that they are failed.
+    """
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.analysis_job_stale_min)
+    claimable = or_(
+        AnalysisJob.status == "QUEUED",
+        and_(
+            AnalysisJob.status == "RUNNING",
+            AnalysisJob.started_at < stale_before,
+            AnalysisJob.attempts < settings.analysis_job_max_attempts,
+        ),
+    )
+    db = SessionLocal()
+    try:
+        _fail_exhausted_jobs(db, stale_before)
+        for _ in range(3):
+            job = db.query(AnalysisJob.id, AnalysisJob.attempts).filter(claimable).order_by(AnalysisJob.id).first()
+            if job is None:
+                return None
+            claimed = (
+                db.query(AnalysisJob)
+                .filter(AnalysisJob.id == job.id, AnalysisJob.attempts == job.attempts, claimable)
+                .update(
+                    {
+                        AnalysisJob.status: "RUNNING",
+                        AnalysisJob.started_at: datetime.utcnow(),
+                        AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if claimed:
+                return job.id, job.attempts + 1
+        return None
+    finally:
+        db.close()
+
+
+def _job_audio_dir(job_id: int) -> str | None:
+    db = SessionLocal()
+    try:
+        return db.query(AnalysisJob.audio_dir).filter(AnalysisJob.id == job_id).scalar()
+    finally:
+        db.close()
+
+
+def _finish_job(job_id: int, attempt: int, analysis_json: Dict[str, Any] | None) -> bool:
+    """
+    Record the result of attempt `attempt`. Only the worker that still owns the job (RUNNING with the
+    same attempt number) may finish it; a worker whose job was reclaimed meanwhile saves nothing.
+    Returns whether the result was recorded.
+    """
+    db = SessionLocal()
+    try:
+        # Conditional update first: it row-locks the job, so a competing finisher waits and then matches nothing
+        owned = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, AnalysisJob.status == "RUNNING", AnalysisJob.attempts == attempt)
+            .update({AnalysisJob.updated_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        if not owned:
+            db.rollback()
+            return False
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        score = extract_score(analysis_json)
+        dep = db.query(Dependent).filter(Dependent.id == job.dependent_id).first()
+        if score is not None and dep is not None:
+            an = save_analysis_result(db, dep, score, analysis_json)
+            db.flush()
+            job.status = "DONE"
+            job.score = score
+            job.analysis_id = an.id
+            job.message = None
+        else:
+            job.message = (analysis_json or {}).get("message") or "analysis failed"
+            if dep is not None and job.attempts < settings.analysis_job_max_attempts:
+                job.status = "QUEUED"
+            else:
+                job.status = "FAILED"
+        if job.status != "QUEUED":
+            job.finished_at = datetime.utcnow()
+            # Clean up uploaded files once the job is terminal
+            shutil.rmtree(job.audio_dir, ignore_errors=True)
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def _process_job(job_id: int, attempt: int):
+    audio_dir = await asyncio.to_thread(_job_audio_dir, job_id)
+    try:
+        # Call analysis (external service or local fallback)
+        analysis_json = await run_multi_voice_analysis(audio_dir) if audio_dir else None
+    except Exception as e:
+        analysis_json = {"success": False, "message": f"analysis error: {e}"}
+    await asyncio.to_thread(_finish_job, job_id, attempt, analysis_json)
+
+
+async def _worker_loop():
+    while True:
+        try:
+            claimed = await asyncio.to_thread(_claim_next_job)
+        except Exception:
+            claimed = None
+        if claimed is not None:
+            try:
+                await _process_job(*claimed)
+            except Exception:
+                pass
+            continue
+        # Idle: wait for an enqueue signal or poll again (other workers/processes may enqueue)
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.analysis_job_poll_sec)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def start_analysis_workers():
+    """Start ANALYSIS_WORKERS worker tasks on the running event loop (called at app startup)."""
+    global _loop, _wakeup
+    if _workers:
+        return
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    for _ in range(max(0, settings.analysis_workers)):
+        _workers.append(_loop.create_task(_worker_loop()))
+
+
+async def stop_analysis_workers():
+    for task in _workers:
+        task.cancel()
+    for task in _workers:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _workers.clear()
@@ -0,0 +1,383 @@
+import asyncio
+import heapq
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.call import Call
+from app.models.dependent import Dependent
+
+# preferred_call_time is "HH:MM" local wall-clock time (CALL_TZ_OFFSET_MIN from UTC)
+CALL_TIME_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+
+# Heap entry: (due_at UTC, seq, dependent_id, attempt, call_id)
+#   attempt 0      → place the day's first call (RINGING Call row)
+#   attempt k >= 1 → check call_id; if still RINGING mark it FAILED and, while k <= retry_count, ring again
+Entry = Tuple[datetime, int, int, int, int | None]
+
+
+def local_now() -> datetime:
+    """Current time in the call timezone (preferred_call_time is local wall-clock time)."""
+    return datetime.utcnow() + timedelta(minutes=settings.call_tz_offset_min)
+
+
+def next_call_at(preferred_call_time: str | None, now_local: datetime) -> datetime | None:
+    m = CALL_TIME_RE.match((preferred_call_time or "").strip())
+    if not m:
+        return None
+    at = now_local.replace(hour=int(m.group(1)), minute=int(m.group(2)), second=0, microsecond=0)
+    return at if at >= now_local else at + timedelta(days=1)
+
+
+def next_call_utc(preferred_call_time: str | None, now: datetime | None = None) -> datetime | None:
+    """Next occurrence of preferred_call_time strictly after now (UTC in, UTC out)."""
+    now = now or datetime.utcnow()
+    offset = timedelta(minutes=settings.call_tz_offset_min)
+    at = next_call_at(preferred_call_time, now + offset + timedelta(seconds=1))
+    return at - offset if at else None
+
+
+def retry_delay(retry_interval_min: int | None, attempt: int) -> timedelta:
+    """How long attempt `attempt` may ring: retry_interval_min * CALL_RETRY_BACKOFF^attempt, capped."""
+    base = max(1, retry_interval_min or 10)
+    minutes = min(base * (settings.call_retry_backoff ** attempt), max(base, settings.call_retry_max_interval_min))
+    return timedelta(minutes=minutes)
+
+
+class CallSchedule:
+    """
+    Time-ordered heap of the next action per dependent. Updates push a new entry and
+    bump the dependent's live seq (O(log n)); superseded entries are skipped when popped.
+    """
+
+    def __init__(self):
+        self._heap: List[Entry] = []
+        self._live: Dict[int, Tuple[int, int]] = {}  # dependent_id -> (seq, attempt) of its live entry
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self.stale_skipped = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None, wakeup: asyncio.Event | None):
+        self._loop, self._wakeup = loop, wakeup
+
+    def _wake(self):
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def push(self, dep_id: int, due_at: datetime, attempt: int = 0, call_id: int | None = None, replace: bool = True):
+        """Make (due_at, attempt) the dependent's next action; replace=False keeps an existing live entry."""
+        with self._lock:
+            if not replace and dep_id in self._live:
+                return
+            seq = next(self._seq)
+            self._live[dep_id] = (seq, attempt)
+            heapq.heappush(self._heap, (due_at, seq, dep_id, attempt, call_id))
+            is_head = self._heap[0][1] == seq
+        if is_head:
+            self._wake()
+
+    def remove(self, dep_id: int):
+        with self._lock:
+            self._live.pop(dep_id, None)
+
+    def reschedule(self, dep_id: int, preferred_call_time: str | None):
+        """
+        Apply a changed preferred_call_time. A retry chain in progress is left alone; it re-reads
+        the dependent when it finishes and schedules the next day from the current value.
+        """
+        with self._lock:
+            live = self._live.get(dep_id)
+        if live is not None and live[1] > 0:
+            return
+        due = next_call_utc(preferred_call_time)
+        if due is None:
+            self.remove(dep_id)
+        else:
+            self.push(dep_id, due)
+
+    def pop_due(self, now: datetime, limit: int) -> List[Entry]:
+        due: List[Entry] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < limit:
+                entry = heapq.heappop(self._heap)
+                if self._live.get(entry[2], (None,))[0] != entry[1]:
+                    self.stale_skipped += 1
+                    continue
+                del self._live[entry[2]]
+                due.append(entry)
+        return due
+
+    def upcoming(self, until: datetime) -> List[Tuple[int, datetime]]:
+        """
+        (dependent_id, due_at) of live first-call entries (attempt 0) due at or before until, earliest
+        first. Only the heap prefix that is due is visited: a parent later than until prunes its subtree.
+        """
+        found: List[Tuple[int, datetime]] = []
+        with self._lock:
+            stack = [0] if self._heap else []
+            while stack:
+                i = stack.pop()
+                due_at, seq, dep_id, attempt, _ = self._heap[i]
+                if due_at > until:
+                    continue
+                if attempt == 0 and self._live.get(dep_id, (None,))[0] == seq:
+                    found.append((dep_id, due_at))
+                stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(self._heap))
+        return sorted(found, key=lambda item: item[1])
+
+    def next_due(self) -> datetime | None:
+        with self._lock:
+            # Drop superseded heads so the loop does not wake for them
+            while self._heap and self._live.get(self._heap[0][2], (None,))[0] != self._heap[0][1]:
+                heapq.heappop(self._heap)
+                self.stale_skipped += 1
+            return self._heap[0][0] if self._heap else None
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._live.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._live)
+
+    def heap_size(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+call_schedule = CallSchedule()
+
+_task: asyncio.Task | None = None
+_metrics: Dict[str, Any] = {
+    "ticks": 0,
+    "errors": 0,
+    "last_error": None,
+    "last_tick_ms": None,
+    "rebuild_ms": None,
+    "rebuilt_entries": 0,
+    "calls_placed": 0,
+    "retries": 0,
+    "calls_failed": 0,
+    "calls_answered": 0,
+}
+
+
+def rebuild_schedule(now: datetime | None = None) -> int:
+    """
+    Load every dependent's next action from the DB (startup). Dependents with a call still
+    RINGING resume their retry chain; everyone else gets the next preferred_call_time.
+    """
+    now = now or datetime.utcnow()
+    db = SessionLocal()
+    try:
+        deps = (
+            db.query(Dependent.id, Dependent.preferred_call_time, Dependent.retry_interval_min)
+            .filter(Dependent.deleted_at.is_(None), Dependent.preferred_call_time.isnot(None))
+            .all()
+        )
+        ringing = {
+            dep_id: (call_id, created_at) for call_id, dep_id, created_at in (
+                db.query(Call.id, Call.dependent_id, Call.created_at)
+                .filter(Call.status == "RINGING")
+                .order_by(Call.id)
+                .all()
+            )
+        }
+        # Attempts already made in the current chain: unanswered calls placed since local midnight
+        offset = timedelta(minutes=settings.call_tz_offset_min)
+        day_start = (now + offset).replace(hour=0, minute=0, second=0, microsecond=0) - offset
+        attempts = dict(
+            db.query(Call.dependent_id, func.count(Call.id))
+            .filter(Call.dependent_id.in_(list(ringing)), Call.status.in_(("RINGING", "FAILED")),
+                    Call.created_at >= day_start)
+            .group_by(Call.dependent_id)
+            .all()
+        ) if ringing else {}
+    finally:
+        db.close()
+
+    call_schedule.clear()
+    for dep_id, preferred, interval in deps:
+        if dep_id in ringing:
+            call_id, created_at = ringing[dep_id]
+            attempt = max(1, attempts.get(dep_id, 1))
+            call_schedule.push(dep_id, created_at + retry_delay(interval, attempt - 1), attempt, call_id)
+            continue
+        due = next_call_utc(preferred, now)
+        if due is not None:
+            call_schedule.push(dep_id, due)
+    return len(call_schedule)
+
+
+def _ring(db, dep_id: int) -> Call:
+    call = Call(dependent_id=dep_id, status="RINGING", question_audio_path="", answer_audio_path="")
+    db.add(call)
+    db.flush()
+    return call
+
+
+def _fire_batch(entries: List[Entry], now: datetime) -> List[Tuple[int, datetime, int, int | None]]:
+    """
+    Execute due entries in one transaction. Returns the follow-up entries
+    (dependent_id, due_at, attempt, call_id); dependents without one drop out of the schedule.
+    """
+    dep_ids = {e[2] for e in entries}
+    call_ids = [e[4] for e in entries if e[4] is not None]
+    db = SessionLocal()
+    try:
+        deps = {
+            d.id: d for d in db.query(
+                Dependent.id, Dependent.preferred_call_time, Dependent.retry_count, Dependent.retry_interval_min
+            ).filter(Dependent.id.in_(dep_ids), Dependent.deleted_at.is_(None))
+        }
+        calls = {c.id: c for c in db.query(Call).filter(Call.id.in_(call_ids))} if call_ids else {}
+        # A call already placed for this slot (e.g. by an instance that restarted) is not placed twice
+        recent = {
+            r[0] for r in db.query(Call.dependent_id)
+            .filter(Call.dependent_id.in_(dep_ids), Call.created_at >= now - timedelta(minutes=1))
+        }
+
+        follow_ups = []
+        for _, _, dep_id, attempt, call_id in entries:
+            dep = deps.get(dep_id)
+            if dep is None:
+                continue
+            if attempt == 0:
+                if dep_id not in recent:
+                    call = _ring(db, dep_id)
+                    _metrics["calls_placed"] += 1
+                    follow_ups.append((dep_id, now + retry_delay(dep.retry_interval_min, 0), 1, call.id))
+                    continue
+            else:
+                call = calls.get(call_id)
+                if call is not None and call.status == "RINGING":
+                    call.status = "FAILED"
+                    _metrics["calls_failed"] += 1
+                    if attempt <= (dep.retry_count or 0):
+                        retry = _ring(db, dep_id)
+                        _metrics["retries"] += 1
+                        follow_ups.append((dep_id, now + retry_delay(dep.retry_interval_min, attempt), attempt + 1, retry.id))
+                        continue
+                elif call is not None and call.status in ("CONNECTED", "COMPLETED"):
+                    _metrics["calls_answered"] += 1
+            due = next_call_utc(dep.preferred_call_time, now)
+            if due is not None:
+                follow_ups.append((dep_id, due, 0, None))
+        db.commit()
+        return follow_ups
+    finally:
+        db.close()
+
+
+async def run_due_calls(now: datetime | None = None) -> int:
+    now = now or datetime.utcnow()
+    fired = 0
+    while True:
+        entries = call_schedule.pop_due(now, max(1, settings.call_scheduler_batch_size))
+        if not entries:
+            return fired
+        try:
+            follow_ups = await asyncio.to_thread(_fire_batch, entries, now)
+        except Exception:
+            # Put the batch back (a retry check must not be lost) and let the next tick try again
+            for due_at, _, dep_id, attempt, call_id in entries:
+                call_schedule.push(dep_id, due_at + timedelta(minutes=1), attempt, call_id, replace=False)
+            raise
+        for dep_id, due_at, attempt, call_id in follow_ups:
+            # A reschedule that happened while this batch ran wins over a next-day entry
+            call_schedule.push(dep_id, due_at, attempt, call_id, replace=attempt > 0)
+        fired += len(entries)
+
+
+async def _scheduler_loop(wakeup: asyncio.Event):
+    while True:
+        next_due = call_schedule.next_due()
+        # Sleep until the earliest entry (capped so clock adjustments are picked up), or until woken by a change
+        timeout = settings.call_scheduler_max_sleep_sec
+        if next_due is not None:
+            timeout = min(timeout, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+        t0 = time.perf_counter()
+        try:
+            if await run_due_calls():
+                _metrics["ticks"] += 1
+                _metrics["last_tick_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            _metrics["last_error"] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _metrics["errors"] += 1
+            _metrics["last_error"] = str(e)
+            await asyncio.sleep(1.0)
+
+
+def start_call_scheduler():
+    """Rebuild the schedule from the DB and run it on the running event loop (called at app startup)."""
+    global _task
+    if _task is not None or not settings.call_scheduler_enabled:
+        return
+    t0 = time.perf_counter()
+    _metrics["rebuilt_entries"] = rebuild_schedule()
+    _metrics["rebuild_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    wakeup = asyncio.Event()
+    call_schedule.bind(asyncio.get_running_loop(), wakeup)
+    _task = asyncio.get_running_loop().create_task(_scheduler_loop(wakeup))
+
+
+async def stop_call_scheduler():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    call_schedule.bind(None, None)
+
+
+def schedule_dependent(dep_id: int, preferred_call_time: str | None):
+    """Called after a dependent's call settings change (create/update)."""
+    if _task is not None:
+        call_schedule.reschedule(dep_id, preferred_call_time)
+
+
+def upcoming_calls(until: datetime) -> List[Tuple[int, datetime]] | None:
+    """First calls (dependent_id, due_at UTC) due by until, or None when the scheduler is not running here."""
+    if _task is None:
+        return None
+    return call_schedule.upcoming(until)
+
+
+def unschedule_dependent(dep_id: int):
+    call_schedule.remove(dep_id)
+
+
+def call_scheduler_metrics() -> Dict[str, Any]:
+    next_due = call_schedule.next_due()
+    return {
+        "enabled": settings.call_scheduler_enabled,
+        "running": _task is not None and not _task.done(),
+        "scheduled": len(call_schedule),
+        "heap_size": call_schedule.heap_size(),
+        "stale_skipped": call_schedule.stale_skipped,
+        "next_due_at": next_due.isoformat() if next_due else None,
+        **_metrics,
+    }
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import re
+from app.core.config import settings
+
+# Content-addressed mel image store: MEDIA_ROOT/images/<h[:2]>/<sha256>.<ext>
+IMAGE_KEY_RE = re.compile(r"^[0-9a-f]{64}\.(jpg|png)$")
+
+
+def images_root() -> str:
+    return os.path.join(settings.media_root, "images")
+
+
+def is_valid_key(key: str) -> bool:
+    return bool(IMAGE_KEY_RE.match(key or ""))
+
+
+def image_path(key: str) -> str:
+    return os.path.join(images_root(), key[:2], key)
+
+
+def image_url(dep_id: int, key: str | None) -> str | None:
+    return f"/dependents/{dep_id}/mel-images/{key}" if key else None
+
+
+def store_image_bytes(data: bytes, ext: str = "jpg") -> str:
+    """Store image bytes once (deduplicated by sha256) and return the key."""
+    key = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+    path = image_path(key)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return key
+
+
+def store_image_file(src_path: str) -> str | None:
+    """Store an image file from disk (e.g. the AI service's mel JPEG). Returns None if unreadable."""
+    ext = "png" if src_path.lower().endswith(".png") else "jpg"
+    try:
+        with open(src_path, "rb") as f:
+            return store_image_bytes(f.read(), ext)
+    except OSError:
+        return None
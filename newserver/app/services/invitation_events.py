@@ -0,0 +1,50 @@
+import asyncio
+from typing import Dict, Set
+
+# In-process wake-ups for invitation status waiters (long-poll / SSE), keyed by invitation code.
+# Only reaches waiters in this worker process; waiters also re-check the DB periodically
+# so changes committed by other workers are still picked up.
+_loop: asyncio.AbstractEventLoop | None = None
+_waiters: Dict[str, Set[asyncio.Event]] = {}
+
+
+def _wake(code: str):
+    for ev in _waiters.get(code, ()):
+        ev.set()
+
+
+def notify_invitation(code: str):
+    """Wake waiters for code. Safe to call from sync routes running in the threadpool."""
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        _wake(code)
+    else:
+        _loop.call_soon_threadsafe(_wake, code)
+
+
+async def wait_for_invitation(code: str, timeout: float) -> bool:
+    """Wait until notify_invitation(code) or timeout; returns True when notified."""
+    global _loop
+    _loop = asyncio.get_running_loop()
+    ev = asyncio.Event()
+    _waiters.setdefault(code, set()).add(ev)
+    try:
+        await asyncio.wait_for(ev.wait(), timeout=max(0.0, timeout))
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        waiters = _waiters.get(code)
+        if waiters is not None:
+            waiters.discard(ev)
+            if not waiters:
+                del _waiters[code]
+
+
+def invitation_waiter_count() -> int:
+    return sum(len(w) for w in _waiters.values())
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+# bcrypt runs on its own small pool so login storms cannot occupy the shared request threadpool.
+# Counters are only touched from the event loop thread, so no lock is needed.
+_executor: ThreadPoolExecutor | None = None
+_pending = 0
+_active_keys: Counter = Counter()
+_metrics: Dict[str, Any] = {"completed": 0, "rejected_queue": 0, "rejected_key": 0, "max_pending": 0, "total_ms": 0.0}
+
+
+class PasswordHashBusy(Exception):
+    """Raised when the hash queue is full or a caller (IP/email) already has too many hashes in flight."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.password_hash_workers), thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _run(fn, *args, keys: Iterable[str] = ()):
+    global _pending
+    keys = [k for k in keys if k]
+    if _pending >= max(1, settings.password_hash_workers) + settings.password_hash_max_queue:
+        _metrics["rejected_queue"] += 1
+        raise PasswordHashBusy("Too many password operations in progress")
+    if any(_active_keys[k] >= settings.password_hash_per_key_limit for k in keys):
+        _metrics["rejected_key"] += 1
+        raise PasswordHashBusy("Too many concurrent attempts")
+
+    _pending += 1
+    _metrics["max_pending"] = max(_metrics["max_pending"], _pending)
+    for k in keys:
+        _active_keys[k] += 1
+    t0 = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+        for k in keys:
+            _active_keys[k] -= 1
+            if _active_keys[k] <= 0:
+                del _active_keys[k]
+        _metrics["completed"] += 1
+        _metrics["total_ms"] += (time.perf_counter() - t0) * 1000.0
+
+
+async def hash_password(password: str, keys: Iterable[str] = ()) -> str:
+    return await _run(get_password_hash, password, keys=keys)
+
+
+async def check_password(password: str, hashed: str, keys: Iterable[str] = ()) -> bool:
+    return await _run(verify_password, password, hashed, keys=keys)
+
+
+def shutdown_password_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def password_hash_metrics() -> Dict[str, Any]:
+    completed = _metrics["completed"]
+    return {
+        "workers": settings.password_hash_workers,
+        "max_queue": settings.password_hash_max_queue,
+        "per_key_limit": settings.password_hash_per_key_limit,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "pending": _pending,
+        "max_pending": _metrics["max_pending"],
+        "completed": completed,
+        "rejected_queue": _metrics["rejected_queue"],
+        "rejected_key": _metrics["rejected_key"],
+        "avg_ms": round(_metrics["total_ms"] / completed, 2) if completed else None,
+    }
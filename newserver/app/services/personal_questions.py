@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import or_
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.dependent import Dependent
+from app.services.call_scheduler import local_now, next_call_at, upcoming_calls
+from app.services.questions import (
+    current_question_version, is_complete_set, new_version_id,
+    publish_version_dir, question_paths, question_version_dir, questions_root_dir, staging_dir,
+)
+from app.services.tts import link_or_copy, synthesize_to_wav
+
+# Per-dependent question sets, precomputed ahead of each dependent's preferred_call_time.
+# Layout: questions_root/dependents/<dep_id>/{CURRENT, versions/<version_id>/a1..aN.wav + meta.json}
+# (same double-buffered publish as the global set). meta.json records the call date the set is for.
+# Only LLM-generated questions are published; without them the dependent keeps the global set.
+META_FILE = "meta.json"
+
+_task: asyncio.Task | None = None
+_metrics: Dict[str, Any] = {
+    "runs": 0,
+    "errors": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_error": None,
+    "sets_generated": 0,
+    "llm_batches": 0,
+    "llm_fallbacks": 0,
+    "dependents_skipped": 0,
+    "texts_total": 0,
+    "texts_synthesized": 0,
+    "dirs_removed": 0,
+    "last_cleanup_date": None,
+}
+
+
+def dependents_questions_root() -> str:
+    return os.path.join(questions_root_dir(), "dependents")
+
+
+def dependent_questions_base(dep_id: int) -> str:
+    return os.path.join(dependents_questions_root(), str(int(dep_id)))
+
+
+def _read_meta(qdir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(qdir, META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _current_set(dep_id: int) -> Tuple[str | None, str | None, Dict[str, Any]]:
+    base = dependent_questions_base(dep_id)
+    version = current_question_version(base)
+    qdir = question_version_dir(version, base)
+    return version, qdir, (_read_meta(qdir) if qdir else {})
+
+
+def personal_question_set(dep_id: int) -> Tuple[str, str] | None:
+    """(version, dir) of the dependent's set for today's call, or None to fall back to the global set."""
+    version, qdir, meta = _current_set(dep_id)
+    if not qdir or meta.get("for_date") != local_now().date().isoformat():
+        return None
+    if not is_complete_set(question_paths(qdir)):
+        return None
+    return version, qdir
+
+
+def personal_version_dir(dep_id: int, version: str | None) -> str | None:
+    return question_version_dir(version, dependent_questions_base(dep_id))
+
+
+def _generate_batch_with_gemini(names: Dict[int, str]) -> Dict[int, List[str]]:
+    """
+    One LLM request for a whole batch of dependents. Returns {dep_id: [q1, q2, q3]} for the
+    dependents the reply covered; the rest are left out (no personal set, so they use the global
+    set and are retried on the next scan).
+    """
+    result: Dict[int, List[str]] = {}
+    if not settings.gemini_api_key or not names:
+        return result
+
+    system = (
+        "당신은 고령의 사용자와 대화할 상냥한 비서입니다. "
+        "아래 각 피보호자에게 건넬 일상 대화용 한국어 질문을 3개씩 생성하세요. 각 질문은 40자 이하, 공손하고 따뜻한 톤. "
+        "JSON 객체만 출력하세요. 키는 피보호자 번호(문자열), 값은 질문 3개의 배열입니다."
+    )
+    user = "\n".join(f"{dep_id}: {name or ''}" for dep_id, name in names.items())
+
+    try:
+        from openai import OpenAI
+        client = OpenAI(
+            api_key=settings.gemini_api_key,
+            base_url=settings.gemini_api_base
+        )
+        resp = client.chat.completions.create(
+            model=settings.gemini_model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            temperature=0.7,
+            max_tokens=256 * max(1, len(names)),
+        )
+        text = (resp.choices[0].message.content or "").strip()
+        text = text.strip("`").removeprefix("json").strip()
+        data = json.loads(text)
+        for key, qs in (data.items() if isinstance(data, dict) else []):
+            try:
+                dep_id = int(key)
+            except (TypeError, ValueError):
+                continue
+            qs = [str(q).strip() for q in (qs or []) if str(q).strip()] if isinstance(qs, list) else []
+            if dep_id in names and len(qs) >= 3:
+                result[dep_id] = qs[:3]
+    except Exception:
+        _metrics["llm_fallbacks"] += 1
+    return result
+
+
+def _call_time_ranges(start: datetime, end: datetime) -> List[Tuple[str, str]]:
+    """
+    "HH:MM" string ranges covering local wall-clock times start..end (split at midnight), for an
+    indexed range scan on preferred_call_time. Unpadded hours ("9:30") get their own range.
+    """
+    if end - start >= timedelta(days=1):
+        return [("", "~")]
+    spans = [(start, end)] if start.date() == end.date() else [
+        (start, start.replace(hour=23, minute=59)), (end.replace(hour=0, minute=0), end)
+    ]
+    ranges = []
+    for lo, hi in spans:
+        ranges.append((f"{lo:%H:%M}", f"{hi:%H:%M}"))
+        if lo.hour < 10:
+            top = hi if hi.hour < 10 else hi.replace(hour=9, minute=59)
+            ranges.append((f"{lo.hour}:{lo:%M}", f"{top.hour}:{top:%M}"))
+    return ranges
+
+
+def _upcoming_from_db(now_local: datetime, lead: timedelta) -> List[Tuple[int, datetime]]:
+    """(dependent_id, call time local) from a preferred_call_time window query (call scheduler not running here)."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Dependent.id, Dependent.preferred_call_time)
+            .filter(
+                Dependent.deleted_at.is_(None),
+                or_(*(Dependent.preferred_call_time.between(lo, hi)
+                      for lo, hi in _call_time_ranges(now_local, now_local + lead))),
+            )
+            .all()
+        )
+    finally:
+        db.close()
+    upcoming = []
+    for dep_id, preferred in rows:
+        at = next_call_at(preferred, now_local)
+        if at is not None and at - now_local <= lead:
+            upcoming.append((dep_id, at))
+    return sorted(upcoming, key=lambda item: item[1])
+
+
+def _due_dependents(now_local: datetime) -> List[Tuple[int, str, date]]:
+    """
+    Dependents whose next call is within PERSONAL_QUESTIONS_LEAD_MIN and have no set for that date yet.
+    Candidates come from the call-scheduler heap, or from an indexed time-window query when the
+    scheduler runs on another instance; only their names are read from the DB.
+    """
+    lead = timedelta(minutes=settings.personal_questions_lead_min)
+    offset = timedelta(minutes=settings.call_tz_offset_min)
+    upcoming = upcoming_calls(now_local - offset + lead)
+    if upcoming is None:
+        upcoming = _upcoming_from_db(now_local, lead)
+    else:
+        upcoming = [(dep_id, due_at + offset) for dep_id, due_at in upcoming]
+
+    pending: Dict[int, date] = {}
+    for dep_id, at in upcoming:
+        if _current_set(dep_id)[2].get("for_date") == at.date().isoformat():
+            continue
+        pending[dep_id] = at.date()
+        if len(pending) >= settings.personal_questions_max_per_run:
+            break
+    if not pending:
+        return []
+
+    db = SessionLocal()
+    try:
+        names = dict(
+            db.query(Dependent.id, Dependent.name)
+            .filter(Dependent.id.in_(list(pending)), Dependent.deleted_at.is_(None))
+            .all()
+        )
+    finally:
+        db.close()
+    return [(dep_id, names[dep_id], for_date) for dep_id, for_date in pending.items() if dep_id in names]
+
+
+async def _generate_batch(batch: List[Tuple[int, str, date]]):
+    names = {dep_id: name for dep_id, name, _ in batch}
+    texts = await asyncio.to_thread(_generate_batch_with_gemini, names)
+    _metrics["llm_batches"] += 1
+    _metrics["dependents_skipped"] += len(names) - len(texts)
+    batch = [item for item in batch if item[0] in texts]
+    if not batch:
+        return
+
+    # Synthesize each distinct text once (replies often repeat questions), then link into each set
+    count = len(question_paths(""))
+    all_texts = [t for dep_id in texts for t in texts[dep_id][:count]]
+    unique = list(dict.fromkeys(all_texts))
+    _metrics["texts_total"] += len(all_texts)
+    _metrics["texts_synthesized"] += len(unique)
+
+    work = os.path.join(dependents_questions_root(), f".batch-{uuid.uuid4().hex}")
+    os.makedirs(work, exist_ok=True)
+    try:
+        audio = {t: os.path.join(work, hashlib.sha256(t.encode("utf-8")).hexdigest() + ".wav") for t in unique}
+        sem = asyncio.Semaphore(max(1, settings.question_tts_concurrency))
+
+        async def _synth(text: str):
+            async with sem:
+                await asyncio.to_thread(synthesize_to_wav, text, audio[text])
+
+        await asyncio.gather(*(_synth(t) for t in unique))
+
+        for dep_id, _, for_date in batch:
+            await asyncio.to_thread(_publish_dependent_set, dep_id, for_date, texts[dep_id], audio)
+            _metrics["sets_generated"] += 1
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _publish_dependent_set(dep_id: int, for_date: date, texts: List[str], audio: Dict[str, str]):
+    base = dependent_questions_base(dep_id)
+    version = new_version_id()
+    staging = staging_dir(version, base)
+    try:
+        paths = question_paths(staging)
+        for text, path in zip(texts, paths):
+            link_or_copy(audio[text], path)
+        if not is_complete_set(paths):
+            raise RuntimeError(f"incomplete question set for dependent {dep_id}")
+        with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"dependent_id": dep_id, "for_date": for_date.isoformat(), "texts": texts[:len(paths)]}, f, ensure_ascii=False)
+        publish_version_dir(staging, version, base)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _cleanup(today: date) -> int:
+    """Remove sets of deleted dependents, sets older than PERSONAL_QUESTIONS_RETENTION_DAYS and stale batch dirs."""
+    root = dependents_questions_root()
+    if not os.path.isdir(root):
+        return 0
+    dep_dirs: Dict[int, str] = {}
+    for e in os.scandir(root):
+        if not e.is_dir():
+            continue
+        if e.name.startswith(".batch-"):
+            if e.stat().st_mtime < time.time() - 3600:
+                shutil.rmtree(e.path, ignore_errors=True)
+            continue
+        if e.name.isdigit():
+            dep_dirs[int(e.name)] = e.path
+    if not dep_dirs:
+        return 0
+    db = SessionLocal()
+    try:
+        active = {
+            r[0] for r in db.query(Dependent.id)
+            .filter(Dependent.id.in_(list(dep_dirs)), Dependent.deleted_at.is_(None))
+            .all()
+        }
+    finally:
+        db.close()
+    oldest = (today - timedelta(days=settings.personal_questions_retention_days)).isoformat()
+    removed = 0
+    for dep_id, path in dep_dirs.items():
+        for_date = _current_set(dep_id)[2].get("for_date") or ""
+        if dep_id not in active or for_date < oldest:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+async def run_personal_questions_once() -> int:
+    now_local = local_now()
+    # Without an LLM there is nothing personal to publish; everyone uses the global set
+    due = await asyncio.to_thread(_due_dependents, now_local) if settings.gemini_api_key else []
+    size = max(1, settings.personal_questions_batch_size)
+    for i in range(0, len(due), size):
+        await _generate_batch(due[i:i + size])
+    # Retention is counted in days, so the directory sweep runs once per local day
+    if _metrics["last_cleanup_date"] != now_local.date().isoformat():
+        _metrics["dirs_removed"] += await asyncio.to_thread(_cleanup, now_local.date())
+        _metrics["last_cleanup_date"] = now_local.date().isoformat()
+    return len(due)
+
+
+async def _scheduler_loop():
+    while True:
+        t0 = time.perf_counter()
+        try:
+            await run_personal_questions_once()
+            _metrics["last_error"] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _metrics["errors"] += 1
+            _metrics["last_error"] = str(e)
+        _metrics["runs"] += 1
+        _metrics["last_run_at"] = datetime.utcnow().isoformat()
+        _metrics["last_duration_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        await asyncio.sleep(max(1.0, settings.personal_questions_scan_min * 60.0))
+
+
+def start_personal_question_scheduler():
+    """Schedule precomputation on the running event loop (called at app startup)."""
+    global _task
+    if _task is None and settings.personal_questions_enabled:
+        _task = asyncio.get_running_loop().create_task(_scheduler_loop())
+
+
+async def stop_personal_question_scheduler():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def personal_question_metrics() -> Dict[str, Any]:
+    return {
+        "enabled": settings.personal_questions_enabled,
+        "lead_min": settings.personal_questions_lead_min,
+        "batch_size": settings.personal_questions_batch_size,
+        **_metrics,
+    }
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app.core.config import settings
+from app.models.dependent import Dependent
+from app.models.user import User
+
+# Resolved auth principals keyed by (kind, id); values are column snapshots, never live ORM objects
+PrincipalKey = Tuple[str, int]
+
+
+class PrincipalCache:
+    """Bounded LRU of principal column snapshots with a per-entry TTL."""
+
+    def __init__(self, max_items: int, ttl_sec: float):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._items: "OrderedDict[PrincipalKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl_sec > 0
+
+    def get(self, key: PrincipalKey) -> Dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._items[key]
+                self._stats["expired"] += 1
+                item = None
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self._stats["hits"] += 1
+            return item[1]
+
+    def put(self, key: PrincipalKey, values: Dict[str, Any]):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_sec, values)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: PrincipalKey):
+        with self._lock:
+            if self._items.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "ttl_sec": self.ttl_sec,
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+principal_cache = PrincipalCache(settings.principal_cache_max_items, settings.principal_cache_ttl_sec)
+
+
+def _snapshot(obj) -> Dict[str, Any]:
+    """Loaded column values only (deferred columns stay unloaded)."""
+    state = inspect(obj)
+    return {attr.key: getattr(obj, attr.key) for attr in state.mapper.column_attrs if attr.key not in state.unloaded}
+
+
+def _attach(db: Session, model, values: Dict[str, Any]):
+    """Rebuild the instance from a snapshot and attach it to the request session without a SELECT."""
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return db.merge(obj, load=False)
+
+
+def _resolve(db: Session, model, kind: str, ident: int):
+    key = (kind, ident)
+    values = principal_cache.get(key)
+    if values is not None:
+        return _attach(db, model, values)
+    obj = db.query(model).filter(model.id == ident).first()
+    if obj is not None:
+        principal_cache.put(key, _snapshot(obj))
+    return obj
+
+
+def resolve_user(db: Session, user_id: int) -> User | None:
+    return _resolve(db, User, "user", user_id)
+
+
+def resolve_dependent(db: Session, dep_id: int) -> Dependent | None:
+    return _resolve(db, Dependent, "dependent", dep_id)
+
+
+def invalidate_user(user_id: int):
+    principal_cache.invalidate(("user", user_id))
+
+
+def invalidate_dependent(dep_id: int):
+    principal_cache.invalidate(("dependent", dep_id))
+
+
+# Any ORM update/delete (deactivation, soft delete, profile or state change) drops the cached principal.
+# Dropped again after commit so a concurrent request cannot re-cache the pre-commit row.
+def _changed(key: PrincipalKey, target):
+    principal_cache.invalidate(key)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principal_invalidations", set()).add(key)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    _changed(("user", target.id), target)
+
+
+@event.listens_for(Dependent, "after_update")
+@event.listens_for(Dependent, "after_delete")
+def _dependent_changed(mapper, connection, target):
+    _changed(("dependent", target.id), target)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for key in session.info.pop("principal_invalidations", ()):
+        principal_cache.invalidate(key)
@@ -1,9 +1,12 @@
+import asyncio
+import io
 import os
+import re
 import shutil
-import threading
 import time
+import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List
 from app.core.config import settings
 from app.services.tts import synthesize_to_wav
 
@@ -13,13 +16,62 @@ DEFAULT_QUESTIONS_KO = [
     "오늘 식사는 맛있게 하셨나요?",
 ]
 
-def global_questions_dir() -> str:
+# questions_root layout (double-buffered):
+#   versions/<version_id>/a1.wav..aN.wav   complete, immutable question sets
+#   CURRENT                                 id of the version readers should use
+# A new set is generated under versions/.staging-<id>, renamed into place, then CURRENT is
+# replaced atomically, so readers never see a partially generated set.
+CURRENT_POINTER = "CURRENT"
+# Each published version also carries its precomposed multipart/form-data body (a1..aN.wav parts)
+BUNDLE_FILE = "bundle.multipart"
+MULTIPART_BOUNDARY = "----memoryon-boundary"
+VERSION_ID_RE = re.compile(r"^[0-9]{20}-[0-9a-f]{6}$")
+
+# Generation runs on the app event loop; concurrent callers share one in-flight task
+_inflight: asyncio.Task | None = None
+_daily_task: asyncio.Task | None = None
+_stage_metrics: Dict[str, Dict[str, float]] = {}
+_pipeline_metrics: Dict[str, Any] = {"runs": 0, "errors": 0, "last_version": None, "bundles_built": 0}
+
+def questions_root_dir() -> str:
     base = settings.questions_root
     if not os.path.isabs(base):
         base = os.path.join(os.getcwd(), base)
     os.makedirs(base, exist_ok=True)
     return base
 
+# base: directory holding CURRENT + versions/ (questions_root for the global set,
+# questions_root/dependents/<id> for personalized sets)
+def _versions_dir(base: str | None = None) -> str:
+    return os.path.join(base or questions_root_dir(), "versions")
+
+def new_version_id() -> str:
+    return f"{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+
+def staging_dir(version: str, base: str | None = None) -> str:
+    path = os.path.join(_versions_dir(base), f".staging-{version}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def current_question_version(base: str | None = None) -> str | None:
+    try:
+        with open(os.path.join(base or questions_root_dir(), CURRENT_POINTER), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if VERSION_ID_RE.match(version) else None
+
+def question_version_dir(version: str | None, base: str | None = None) -> str | None:
+    """Directory of a published version, or None if unknown/already removed."""
+    if not version or not VERSION_ID_RE.match(version):
+        return None
+    path = os.path.join(_versions_dir(base), version)
+    return path if os.path.isdir(path) else None
+
+def global_questions_dir() -> str:
+    """Directory of the current complete question set (questions_root itself before the first swap)."""
+    return question_version_dir(current_question_version()) or questions_root_dir()
+
 def _generate_questions_with_gemini(dep_name: str | None = None) -> List[str]:
     """
     Generate three daily questions using Google Gemini 2.5 Flash if configured. Returns 3 strings.
@@ -60,61 +112,199 @@ def _generate_questions_with_gemini(dep_name: str | None = None) -> List[str]:
         pass
     return DEFAULT_QUESTIONS_KO[:3]
 
-def ensure_global_questions(questions: List[str] | None = None) -> list[str]:
+def question_paths(qdir: str) -> list[str]:
+    count = max(1, int(getattr(settings, 'daily_questions_count', 3)))
+    return [os.path.join(qdir, f"a{i}.wav") for i in range(1, count + 1)]
+
+def is_complete_set(paths: list[str]) -> bool:
+    return all(os.path.exists(p) and os.path.getsize(p) > 0 for p in paths)
+
+async def _timed(stage: str, fn, *args):
+    """Run a blocking stage function in a worker thread and record its duration."""
+    t0 = time.perf_counter()
+    try:
+        return await asyncio.to_thread(fn, *args)
+    finally:
+        _record_stage(stage, (time.perf_counter() - t0) * 1000.0)
+
+def _record_stage(stage: str, ms: float):
+    m = _stage_metrics.setdefault(stage, {"count": 0, "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0})
+    m["count"] += 1
+    m["last_ms"] = round(ms, 1)
+    m["max_ms"] = round(max(m["max_ms"], ms), 1)
+    m["total_ms"] += ms
+
+def _write_bundle(qdir: str, out):
+    for path in question_paths(qdir):
+        if not os.path.exists(path):
+            continue
+        out.write((
+            f"--{MULTIPART_BOUNDARY}\r\n"
+            f"Content-Disposition: form-data; name=\"file\"; filename=\"{os.path.basename(path)}\"\r\n"
+            f"Content-Type: audio/wav\r\n\r\n"
+        ).encode("utf-8"))
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, out)
+        out.write(b"\r\n")
+    out.write(f"--{MULTIPART_BOUNDARY}--\r\n".encode("utf-8"))
+
+def build_question_bundle(qdir: str) -> str:
+    """Path of the set's multipart body, composed once per (immutable) version directory."""
+    path = os.path.join(qdir, BUNDLE_FILE)
+    if not os.path.exists(path):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            _write_bundle(qdir, f)
+        os.replace(tmp, path)
+        _pipeline_metrics["bundles_built"] += 1
+    return path
+
+def question_bundle_bytes(qdir: str) -> bytes:
+    """Multipart body for an unversioned directory (legacy layout before the first publish)."""
+    buf = io.BytesIO()
+    _write_bundle(qdir, buf)
+    return buf.getvalue()
+
+def publish_version_dir(staging: str, version: str, base: str | None = None):
+    """Precompose the bundle, rename a complete staging dir into versions/ and atomically point CURRENT at it."""
+    build_question_bundle(staging)
+    os.rename(staging, os.path.join(_versions_dir(base), version))
+    pointer = os.path.join(base or questions_root_dir(), CURRENT_POINTER)
+    tmp = f"{pointer}.{version}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, pointer)
+    _prune_versions(keep=version, base=base)
+
+async def _publish_new_version(questions: List[str] | None = None) -> str:
     """
-    Ensure shared global question WAV files exist under questions_root as a1.wav..aN.wav.
-    If files missing or empty, re-generate all of them via GPT→TTS (or silence).
-    Returns absolute file paths.
+    Generate a full set into a staging dir, rename it into versions/, then swap CURRENT.
+    Stages: llm (question texts) → tts (a1..aN in parallel, at most QUESTION_TTS_CONCURRENCY at once) → publish.
     """
-    qdir = global_questions_dir()
-    count = max(1, int(getattr(settings, 'daily_questions_count', 3)))
-    paths = [os.path.join(qdir, f"a{i}.wav") for i in range(1, count + 1)]
-    need = not all(os.path.exists(p) and os.path.getsize(p) > 0 for p in paths)
-    if need:
+    t0 = time.perf_counter()
+    version = new_version_id()
+    staging = staging_dir(version)
+    try:
         if questions is None:
-            questions = _generate_questions_with_gemini(None)
-        for i, text in enumerate((questions or DEFAULT_QUESTIONS_KO)[:count], start=1):
-            synthesize_to_wav(text, os.path.join(qdir, f"a{i}.wav"))
-    return paths
+            questions = await _timed("llm", _generate_questions_with_gemini, None)
+        paths = question_paths(staging)
+        sem = asyncio.Semaphore(max(1, settings.question_tts_concurrency))
 
-def purge_and_regenerate_global_questions():
+        async def _synth(text: str, path: str):
+            async with sem:
+                await _timed("tts_item", synthesize_to_wav, text, path)
+
+        t_tts = time.perf_counter()
+        await asyncio.gather(*(_synth(text, path) for text, path in zip((questions or DEFAULT_QUESTIONS_KO), paths)))
+        _record_stage("tts", (time.perf_counter() - t_tts) * 1000.0)
+        if not is_complete_set(paths):
+            raise RuntimeError("question generation produced an incomplete set")
+        await _timed("publish", publish_version_dir, staging, version)
+    except BaseException:
+        _pipeline_metrics["errors"] += 1
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _record_stage("total", (time.perf_counter() - t0) * 1000.0)
+    _pipeline_metrics["runs"] += 1
+    _pipeline_metrics["last_version"] = version
+    return version
+
+def _prune_versions(keep: str, base: str | None = None):
+    """Drop old versions beyond QUESTIONS_KEEP_VERSIONS (the previous one stays for in-flight downloads)."""
+    versions = _versions_dir(base)
+    names = sorted(n for n in os.listdir(versions) if VERSION_ID_RE.match(n) and n != keep)
+    for name in names[:max(0, len(names) - max(0, settings.questions_keep_versions - 1))]:
+        shutil.rmtree(os.path.join(versions, name), ignore_errors=True)
+
+def _start_generation(questions: List[str] | None = None) -> asyncio.Task:
+    """Single-flight: return the in-flight generation task, or start one."""
+    global _inflight
+    if _inflight is None or _inflight.done():
+        _inflight = asyncio.get_running_loop().create_task(_publish_new_version(questions))
+        # Consume the exception so an unawaited failure is not logged as "never retrieved"
+        _inflight.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return _inflight
+
+def kick_global_questions():
+    """Start generation in the background if the current set is incomplete (never waits)."""
+    if not is_complete_set(question_paths(global_questions_dir())):
+        _start_generation()
+
+async def ensure_global_questions(questions: List[str] | None = None, timeout: float | None = None) -> list[str]:
     """
-    At midnight, purge the global questions_root folder and regenerate a1..aN.wav.
+    Ensure a complete question set a1.wav..aN.wav is published under questions_root.
+    If the current set is missing or incomplete, join the shared in-flight generation (starting it if
+    needed) for up to timeout seconds. Returns absolute file paths of the current set.
     """
-    qdir = global_questions_dir()
-    # Purge files
-    for name in os.listdir(qdir):
-        try:
-            os.remove(os.path.join(qdir, name))
-        except Exception:
-            pass
-    # Re-generate
-    ensure_global_questions()
+    paths = question_paths(global_questions_dir())
+    if is_complete_set(paths):
+        return paths
+    task = _start_generation(questions)
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except Exception:
+        # Timed out or failed: callers list whatever is currently available
+        pass
+    return question_paths(global_questions_dir())
 
+async def purge_and_regenerate_global_questions():
+    """
+    At midnight, publish a freshly generated a1..aN.wav set and swap it in atomically.
+    Readers keep getting the previous complete set until the swap.
+    """
+    await asyncio.shield(_start_generation())
+
+def question_pipeline_metrics() -> Dict[str, Any]:
+    stages = {
+        name: {"count": m["count"], "last_ms": m["last_ms"], "max_ms": m["max_ms"],
+               "avg_ms": round(m["total_ms"] / m["count"], 1) if m["count"] else None}
+        for name, m in _stage_metrics.items()
+    }
+    return {
+        **_pipeline_metrics,
+        "in_flight": _inflight is not None and not _inflight.done(),
+        "current_version": current_question_version(),
+        "tts_concurrency": settings.question_tts_concurrency,
+        "stages": stages,
+    }
 
 def _seconds_until_next_midnight(now: datetime | None = None) -> float:
     now = now or datetime.utcnow()
     tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0)
     return max(1.0, (tomorrow - now).total_seconds())
 
-def run_daily_generation_once():
-    # Generate shared questions once (purge + regenerate)
-    purge_and_regenerate_global_questions()
+async def run_daily_generation_once():
+    # Generate shared questions once (new version + swap)
+    await purge_and_regenerate_global_questions()
 
-def start_daily_question_job():
-    def _loop():
-        # Initial run on startup
+async def _daily_loop():
+    # Initial run on startup
+    try:
+        await run_daily_generation_once()
+    except Exception:
+        pass
+    # Sleep until next midnight and run repeatedly
+    while True:
         try:
-            run_daily_generation_once()
+            await asyncio.sleep(_seconds_until_next_midnight())
+            await run_daily_generation_once()
+        except asyncio.CancelledError:
+            raise
         except Exception:
+            await asyncio.sleep(60)
+
+def start_daily_question_job():
+    """Schedule daily generation on the running event loop (called at app startup)."""
+    global _daily_task
+    if _daily_task is None:
+        _daily_task = asyncio.get_running_loop().create_task(_daily_loop())
+
+async def stop_daily_question_job():
+    global _daily_task
+    if _daily_task is not None:
+        _daily_task.cancel()
+        try:
+            await _daily_task
+        except asyncio.CancelledError:
             pass
-        # Sleep until next midnight and run repeatedly
-        while True:
-            try:
-                time.sleep(_seconds_until_next_midnight())
-                run_daily_generation_once()
-            except Exception:
-                # avoid crashing the thread
-                time.sleep(60)
-    t = threading.Thread(target=_loop, daemon=True)
-    t.start()
+        _daily_task = None
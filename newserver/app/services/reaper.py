@@ -0,0 +1,199 @@
+import asyncio
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analysis_job import AnalysisJob
+from app.models.invitation import Invitation
+from app.models.voice_session import VoiceSession
+
+# Periodic maintenance: expire abandoned voice sessions, delete stale invitations and
+# remove orphaned MEDIA_ROOT/call-* and session-* directories. Work is done in bounded
+# batches with a pause between them so it never competes with request traffic for long.
+MEDIA_DIR_RE = re.compile(r"^(call-\d+-[0-9a-f]+|session-(\d+))$")
+
+_task: asyncio.Task | None = None
+_metrics: Dict[str, Any] = {
+    "runs": 0,
+    "errors": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_error": None,
+    "sessions_expired": 0,
+    "invitations_deleted": 0,
+    "media_dirs_removed": 0,
+    "media_bytes_reclaimed": 0,
+}
+
+
+def _expire_sessions_batch(now: datetime) -> int:
+    db = SessionLocal()
+    try:
+        ids = [
+            r[0] for r in db.query(VoiceSession.id)
+            .filter(VoiceSession.status == "OPEN", VoiceSession.expires_at < now)
+            .order_by(VoiceSession.id)
+            .limit(settings.reaper_batch_size)
+            .all()
+        ]
+        if not ids:
+            return 0
+        n = (
+            db.query(VoiceSession)
+            .filter(VoiceSession.id.in_(ids), VoiceSession.status == "OPEN")
+            .update({VoiceSession.status: "EXPIRED"}, synchronize_session=False)
+        )
+        db.commit()
+        return n
+    finally:
+        db.close()
+
+
+def _delete_invitations_batch(cutoff: datetime) -> int:
+    db = SessionLocal()
+    try:
+        ids = [
+            r[0] for r in db.query(Invitation.id)
+            .filter(Invitation.expires_at < cutoff)
+            .order_by(Invitation.id)
+            .limit(settings.reaper_batch_size)
+            .all()
+        ]
+        if not ids:
+            return 0
+        n = db.query(Invitation).filter(Invitation.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        return n
+    finally:
+        db.close()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+
+def _orphan_media_dirs(now: datetime) -> list[str]:
+    """call-*/session-* dirs older than REAPER_MEDIA_MIN_AGE_MIN that no live job/session references."""
+    root = settings.media_root
+    try:
+        entries = [e for e in os.scandir(root) if e.is_dir(follow_symlinks=False) and MEDIA_DIR_RE.match(e.name)]
+    except FileNotFoundError:
+        return []
+    min_mtime = (now - timedelta(minutes=settings.reaper_media_min_age_min)).timestamp()
+    candidates = [e for e in entries if e.stat(follow_symlinks=False).st_mtime < min_mtime]
+    if not candidates:
+        return []
+
+    db = SessionLocal()
+    try:
+        # Uploads still waiting for (or under) analysis must survive
+        active_dirs = {
+            os.path.normpath(r[0]) for r in db.query(AnalysisJob.audio_dir)
+            .filter(AnalysisJob.status.in_(("QUEUED", "RUNNING")))
+            .all()
+        }
+        session_ids = [int(m.group(2)) for m in (MEDIA_DIR_RE.match(e.name) for e in candidates) if m.group(2)]
+        open_sessions = {
+            r[0] for r in db.query(VoiceSession.id)
+            .filter(VoiceSession.id.in_(session_ids), VoiceSession.status == "OPEN")
+            .all()
+        } if session_ids else set()
+    finally:
+        db.close()
+
+    orphans = []
+    for e in candidates:
+        m = MEDIA_DIR_RE.match(e.name)
+        if os.path.normpath(e.path) in active_dirs:
+            continue
+        if m.group(2) and int(m.group(2)) in open_sessions:
+            continue
+        orphans.append(e.path)
+        if len(orphans) >= settings.reaper_media_max_dirs:
+            break
+    return orphans
+
+
+def _remove_media_dir(path: str) -> int:
+    size = _dir_size(path)
+    shutil.rmtree(path, ignore_errors=True)
+    return size if not os.path.exists(path) else 0
+
+
+async def _drain(batch_fn, *args) -> int:
+    """Run batch_fn until it reports an empty batch or REAPER_MAX_BATCHES is reached."""
+    total = 0
+    for _ in range(max(1, settings.reaper_max_batches)):
+        n = await asyncio.to_thread(batch_fn, *args)
+        total += n
+        if n < settings.reaper_batch_size:
+            break
+        await asyncio.sleep(settings.reaper_batch_pause_ms / 1000.0)
+    return total
+
+
+async def run_reaper_once() -> Dict[str, int]:
+    now = datetime.utcnow()
+    reclaimed = {"sessions_expired": 0, "invitations_deleted": 0, "media_dirs_removed": 0, "media_bytes_reclaimed": 0}
+    reclaimed["sessions_expired"] = await _drain(_expire_sessions_batch, now)
+    reclaimed["invitations_deleted"] = await _drain(
+        _delete_invitations_batch, now - timedelta(hours=settings.reaper_invitation_retention_hours)
+    )
+    for path in await asyncio.to_thread(_orphan_media_dirs, now):
+        freed = await asyncio.to_thread(_remove_media_dir, path)
+        reclaimed["media_dirs_removed"] += 1
+        reclaimed["media_bytes_reclaimed"] += freed
+        await asyncio.sleep(settings.reaper_batch_pause_ms / 1000.0)
+    return reclaimed
+
+
+async def _reaper_loop():
+    while True:
+        t0 = time.perf_counter()
+        try:
+            reclaimed = await run_reaper_once()
+            for k, v in reclaimed.items():
+                _metrics[k] += v
+            _metrics["last_error"] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _metrics["errors"] += 1
+            _metrics["last_error"] = str(e)
+        _metrics["runs"] += 1
+        _metrics["last_run_at"] = datetime.utcnow().isoformat()
+        _metrics["last_duration_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        await asyncio.sleep(max(1.0, settings.reaper_interval_min * 60.0))
+
+
+def start_reaper():
+    """Schedule the maintenance loop on the running event loop (called at app startup)."""
+    global _task
+    if _task is None and settings.reaper_interval_min > 0:
+        _task = asyncio.get_running_loop().create_task(_reaper_loop())
+
+
+async def stop_reaper():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def reaper_metrics() -> Dict[str, Any]:
+    return {"enabled": settings.reaper_interval_min > 0, "interval_min": settings.reaper_interval_min, **_metrics}
@@ -1,8 +1,39 @@
 import os
 from fastapi import UploadFile
 from app.core.config import settings
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
 def ensure_dir(path: str): os.makedirs(path, exist_ok=True)
+
+
+def save_upload_stream(upload: UploadFile, fp: str, max_bytes: int | None = None, chunk_size: int | None = None) -> int:
+    """
+    Copy an upload to fp in fixed-size chunks so memory stays constant regardless of file size.
+    Raises UploadTooLarge (and removes the partial file) once max_bytes is exceeded. Returns bytes written.
+    """
+    chunk_size = chunk_size or settings.upload_chunk_kb * 1024
+    written = 0
+    try:
+        with open(fp, "wb") as f:
+            while True:
+                chunk = upload.file.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise UploadTooLarge(f"{upload.filename or 'file'} exceeds {max_bytes} bytes")
+                f.write(chunk)
+    except UploadTooLarge:
+        os.remove(fp)
+        raise
+    return written
+
+
 def save_upload(dir_path: str, upload: UploadFile, filename: str | None = None) -> str:
     ensure_dir(dir_path); name = filename or upload.filename; fp = os.path.join(dir_path, name)
-    with open(fp, "wb") as f: f.write(upload.file.read())
+    save_upload_stream(upload, fp)
     return fp
@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+import numpy as np
+from sqlalchemy import case
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.analysis import Analysis
+from app.models.analysis_rollup import AnalysisDailyRollup
+
+BUCKETS = ("day", "week", "month")
+
+
+def local_day(when: datetime) -> date:
+    """Rollup day of a UTC timestamp, in the configured local timezone (CALL_TZ_OFFSET_MIN)."""
+    return (when + timedelta(minutes=settings.call_tz_offset_min)).date()
+
+
+def record_analysis_rollup(db: Session, dependent_id: int, when: datetime, state: float):
+    """
+    Fold one analysis score into its dependent/day rollup row with a single upsert, so concurrent
+    first writes of a day cannot collide on the unique key. Does not commit.
+    """
+    if state is None or state < 0:
+        return  # -1.0 = 미분석
+    t = AnalysisDailyRollup.__table__
+    values = dict(dependent_id=dependent_id, day=local_day(when), count=1,
+                  state_sum=state, state_min=state, state_max=state)
+    merged = {
+        "count": t.c.count + 1,
+        "state_sum": t.c.state_sum + state,
+        "state_min": case((t.c.state_min < state, t.c.state_min), else_=state),
+        "state_max": case((t.c.state_max > state, t.c.state_max), else_=state),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql_insert(t).values(**values).on_duplicate_key_update(**merged)
+    elif dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(t).values(**values).on_conflict_do_update(
+            index_elements=[t.c.dependent_id, t.c.day], set_=merged
+        )
+    else:
+        try:
+            with db.begin_nested():
+                db.execute(t.insert().values(**values))
+        except IntegrityError:
+            db.execute(
+                t.update()
+                .where(t.c.dependent_id == dependent_id, t.c.day == values["day"])
+                .values(**merged)
+            )
+        return
+    db.execute(stmt)
+
+
+def rebuild_rollups(db: Session, dependent_id: int) -> int:
+    """Recompute a dependent's rollups from analyses (backfill). Does not commit. Returns row count."""
+    db.query(AnalysisDailyRollup).filter(AnalysisDailyRollup.dependent_id == dependent_id).delete(synchronize_session=False)
+    rows = (
+        db.query(Analysis.created_at, Analysis.state)
+        .filter(Analysis.dependent_id == dependent_id, Analysis.state >= 0)
+        .all()
+    )
+    if not rows:
+        return 0
+    days = np.array([local_day(r.created_at).toordinal() for r in rows])
+    states = np.array([r.state for r in rows], dtype=float)
+    keys, count, total, lo, hi = _aggregate(days, np.ones_like(states, dtype=int), states, states, states)
+    for k, n, s, mn, mx in zip(keys, count, total, lo, hi):
+        db.add(AnalysisDailyRollup(
+            dependent_id=dependent_id, day=date.fromordinal(int(k)), count=int(n),
+            state_sum=float(s), state_min=float(mn), state_max=float(mx)
+        ))
+    return len(keys)
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _aggregate(keys: np.ndarray, count: np.ndarray, total: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+    """Group daily partial aggregates by key (vectorized)."""
+    uniq, inv = np.unique(keys, return_inverse=True)
+    n = np.zeros(len(uniq), dtype=int)
+    s = np.zeros(len(uniq))
+    mn = np.full(len(uniq), np.inf)
+    mx = np.full(len(uniq), -np.inf)
+    np.add.at(n, inv, count)
+    np.add.at(s, inv, total)
+    np.minimum.at(mn, inv, lo)
+    np.maximum.at(mx, inv, hi)
+    return uniq, n, s, mn, mx
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling. Returns indices of the kept points."""
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold <= 2:
+        return np.array([0, n - 1][:max(threshold, 1)])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep.append(a)
+    keep.append(n - 1)
+    return np.array(keep)
+
+
+def trend_series(
+    db: Session,
+    dependent_id: int,
+    bucket: str = "day",
+    date_from: date | None = None,
+    date_to: date | None = None,
+    points: int | None = None,
+) -> Dict[str, Any]:
+    q = db.query(
+        AnalysisDailyRollup.day,
+        AnalysisDailyRollup.count,
+        AnalysisDailyRollup.state_sum,
+        AnalysisDailyRollup.state_min,
+        AnalysisDailyRollup.state_max,
+    ).filter(AnalysisDailyRollup.dependent_id == dependent_id)
+    if date_from is not None:
+        q = q.filter(AnalysisDailyRollup.day >= date_from)
+    if date_to is not None:
+        q = q.filter(AnalysisDailyRollup.day <= date_to)
+    rows = q.order_by(AnalysisDailyRollup.day).all()
+    if not rows:
+        return {"bucket": bucket, "points": [], "downsampled": False}
+
+    keys = np.array([_bucket_start(r.day, bucket).toordinal() for r in rows])
+    uniq, n, s, mn, mx = _aggregate(
+        keys,
+        np.array([r.count for r in rows]),
+        np.array([r.state_sum for r in rows]),
+        np.array([r.state_min for r in rows]),
+        np.array([r.state_max for r in rows]),
+    )
+    mean = s / n
+
+    idx = np.arange(len(uniq))
+    downsampled = bool(points and points < len(uniq))
+    if downsampled:
+        idx = lttb_indices(uniq.astype(float), mean, points)
+
+    series: List[Dict[str, Any]] = [
+        {
+            "start": date.fromordinal(int(uniq[i])).isoformat(),
+            "mean": round(float(mean[i]), 4),
+            "min": float(mn[i]),
+            "max": float(mx[i]),
+            "count": int(n[i]),
+        }
+        for i in idx
+    ]
+    return {"bucket": bucket, "points": series, "downsampled": downsampled}
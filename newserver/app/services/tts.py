@@ -1,12 +1,21 @@
-import wave, struct, os
+import wave, struct, os, hashlib, threading, uuid, shutil
+from typing import Any, Dict
 from app.core.config import settings
 
 # Google Cloud TTS 인증 설정
 if settings.google_application_credentials:
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.google_application_credentials
 
+TTS_SAMPLE_RATE = 16000
 
-def _write_silence_wav(path: str, seconds: float = 1.0, samplerate: int = 16000):
+# Shared TextToSpeechClient (created on first synthesis, reused afterwards)
+_tts_client = None
+_client_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_cache_metrics: Dict[str, int] = {"hits": 0, "misses": 0, "synth_errors": 0, "evictions": 0}
+
+
+def _write_silence_wav(path: str, seconds: float = 1.0, samplerate: int = TTS_SAMPLE_RATE):
     """Write a silent WAV file as fallback."""
     nframes = int(seconds * samplerate)
     with wave.open(path, 'wb') as wf:
@@ -18,11 +27,92 @@ def _write_silence_wav(path: str, seconds: float = 1.0, samplerate: int = 16000)
             wf.writeframesraw(silence_frame)
 
 
+def get_tts_client():
+    global _tts_client
+    with _client_lock:
+        if _tts_client is None:
+            from google.cloud import texttospeech
+            _tts_client = texttospeech.TextToSpeechClient()
+        return _tts_client
+
+
+def tts_cache_dir() -> str:
+    base = settings.tts_cache_dir or os.path.join(settings.media_root, "tts-cache")
+    os.makedirs(base, exist_ok=True)
+    return base
+
+
+def tts_cache_key(text: str, language: str, voice: str, sample_rate: int) -> str:
+    return hashlib.sha256("\0".join([language, voice, str(sample_rate), text]).encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(data)
+    os.replace(tmp, path)
+
+
+def link_or_copy(src: str, dst: str):
+    """Place src at dst via hardlink (copy across filesystems), replacing dst atomically."""
+    tmp = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _evict_lru(cache_dir: str):
+    """Drop least recently used entries (by mtime, bumped on every hit) beyond TTS_CACHE_MAX_MB."""
+    limit = int(settings.tts_cache_max_mb * 1024 * 1024)
+    entries = []
+    total = 0
+    for e in os.scandir(cache_dir):
+        if e.is_file() and e.name.endswith(".wav"):
+            st = e.stat()
+            entries.append((st.st_mtime, st.st_size, e.path))
+            total += st.st_size
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            _cache_metrics["evictions"] += 1
+        except OSError:
+            pass
+
+
+def _synthesize_google(text: str) -> bytes:
+    from google.cloud import texttospeech
+
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=settings.google_tts_language,
+        name=settings.google_tts_voice,
+    )
+
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+        sample_rate_hertz=TTS_SAMPLE_RATE,
+    )
+
+    response = get_tts_client().synthesize_speech(
+        input=synthesis_input,
+        voice=voice,
+        audio_config=audio_config,
+    )
+    return response.audio_content
+
+
 def synthesize_to_wav(text: str, path: str):
     """
     TTS synthesizer with Google Cloud TTS support.
-    - If GOOGLE_TTS_ENABLED is True, attempts Google Cloud TTS.
-    - Otherwise, writes a 1-second silent WAV as placeholder.
+    - If GOOGLE_TTS_ENABLED is True, serves from the on-disk TTS cache keyed on
+      (text, language, voice, sample rate), calling Google Cloud TTS only on a miss.
+    - Otherwise (or if synthesis fails), writes a 1-second silent WAV as placeholder.
 
     Requires GOOGLE_APPLICATION_CREDENTIALS environment variable
     to be set to the path of the service account JSON file.
@@ -31,34 +121,42 @@ def synthesize_to_wav(text: str, path: str):
 
     if settings.google_tts_enabled:
         try:
-            from google.cloud import texttospeech
+            cache_dir = tts_cache_dir()
+            key = tts_cache_key(text, settings.google_tts_language, settings.google_tts_voice, TTS_SAMPLE_RATE)
+            cached = os.path.join(cache_dir, f"{key}.wav")
+            try:
+                os.utime(cached)  # LRU touch
+                link_or_copy(cached, path)
+                _cache_metrics["hits"] += 1
+                return
+            except FileNotFoundError:
+                pass
 
-            client = texttospeech.TextToSpeechClient()
-
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=settings.google_tts_language,
-                name=settings.google_tts_voice,
-            )
-
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-            )
-
-            response = client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config,
-            )
-
-            with open(path, "wb") as out:
-                out.write(response.audio_content)
+            _cache_metrics["misses"] += 1
+            audio = _synthesize_google(text)
+            with _cache_lock:
+                _write_atomic(cached, audio)
+                _evict_lru(cache_dir)
+            if os.path.exists(cached):
+                link_or_copy(cached, path)
+            else:
+                _write_atomic(path, audio)
             return
 
         except Exception:
-            # Fallback to silence if Google Cloud TTS fails
-            pass
+            # Fallback to silence if Google Cloud TTS fails (never cached)
+            _cache_metrics["synth_errors"] += 1
 
     _write_silence_wav(path)
+
+
+def tts_cache_metrics() -> Dict[str, Any]:
+    cache_dir = tts_cache_dir()
+    files = [e for e in os.scandir(cache_dir) if e.is_file() and e.name.endswith(".wav")]
+    return {
+        "dir": cache_dir,
+        "entries": len(files),
+        "bytes": sum(e.stat().st_size for e in files),
+        "max_mb": settings.tts_cache_max_mb,
+        **_cache_metrics,
+    }
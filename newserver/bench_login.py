@@ -0,0 +1,84 @@
+"""
+Login throughput benchmark.
+
+  # bcrypt verify throughput in-process at a given cost (no server needed)
+  python bench_login.py --local --rounds 12 --workers 2 --requests 50
+
+  # HTTP login storm against a running server (start it with BCRYPT_ROUNDS=<cost>;
+  # all requests share one IP/email, so raise PASSWORD_HASH_PER_KEY_LIMIT to measure raw throughput;
+  # server-side metrics are shown only with SYSTEM_METRICS_PUBLIC=true)
+  python bench_login.py --url http://localhost:8000 --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _report(label: str, latencies: list[float], elapsed: float, extra: dict | None = None):
+    ok = len(latencies)
+    print(f"[{label}] {ok} ok in {elapsed:.2f}s -> {ok / elapsed:.1f} logins/sec")
+    if latencies:
+        lat = sorted(latencies)
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(f"  latency ms: p50={statistics.median(lat):.1f} p95={p95:.1f} max={lat[-1]:.1f}")
+    for k, v in (extra or {}).items():
+        print(f"  {k}: {v}")
+
+
+def bench_local(rounds: int, workers: int, requests: int):
+    from passlib.context import CryptContext
+    ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    hashed = ctx.hash("Bench-Password-123")
+
+    def one(_):
+        t0 = time.perf_counter()
+        ctx.verify("Bench-Password-123", hashed)
+        return (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        latencies = list(ex.map(one, range(requests)))
+    _report(f"local rounds={rounds} workers={workers}", latencies, time.perf_counter() - t0)
+
+
+async def bench_http(url: str, email: str, password: str, concurrency: int, requests: int):
+    import httpx
+    async with httpx.AsyncClient(base_url=url.rstrip("/"), timeout=60) as client:
+        await client.post("/auth/signup", json={"name": "bench", "email": email, "password": password})
+        sem = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+        codes: dict[int, int] = {}
+
+        async def one():
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/auth/login", json={"email": email, "password": password})
+                codes[r.status_code] = codes.get(r.status_code, 0) + 1
+                if r.status_code == 200:
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - t0
+        r = await client.get("/system/password-hash")
+        metrics = r.json() if r.status_code == 200 else f"unavailable (HTTP {r.status_code})"
+    _report(f"http concurrency={concurrency}", latencies, elapsed, {"status codes": codes, "server": metrics})
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--local", action="store_true")
+    p.add_argument("--rounds", type=int, default=12)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--url", default="http://localhost:8000")
+    p.add_argument("--email", default="bench@example.com")
+    p.add_argument("--password", default="Bench-Password-123")
+    p.add_argument("--concurrency", type=int, default=20)
+    p.add_argument("--requests", type=int, default=200)
+    args = p.parse_args()
+    if args.local:
+        bench_local(args.rounds, args.workers, args.requests)
+    else:
+        asyncio.run(bench_http(args.url, args.email, args.password, args.concurrency, args.requests))
@@ -1,2 +1,3 @@
 #!/usr/bin/env bash
-uvicorn app.main:app --reload --port 8000
+# Behind a reverse proxy, set FORWARDED_ALLOW_IPS to the proxy address so request.client is the real client IP
+uvicorn app.main:app --reload --port 8000 --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
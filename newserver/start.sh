@@ -1 +1 @@
-nohup uvicorn main:app --reload --port 8000 > server.log 2>&1 &
+nohup uvicorn main:app --reload --port 8000 --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" > server.log 2>&1 &
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time; point them at a throwaway SQLite DB before importing the app
+_tmp = tempfile.mkdtemp(prefix="memoryon-test-")
+os.environ.update({
+    "APP_ENV": "test",
+    "SECRET_KEY": "test-secret",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "ALGORITHM": "HS256",
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    "MEDIA_ROOT": os.path.join(_tmp, "media"),
+    "QUESTIONS_ROOT": os.path.join(_tmp, "q"),
+    "GOOGLE_TTS_ENABLED": "false",
+    "BCRYPT_ROUNDS": "4",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.principals import principal_cache  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        principal_cache.clear()
+
+
+@pytest.fixture
+def client():
+    # No context manager: startup hooks (schedulers, workers) are not started
+    return TestClient(app)
+
+
+@pytest.fixture
+def caregiver(db):
+    user = User(name="caregiver", email="caregiver@example.com", password_hash="x", role="CAREGIVER")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_headers(caregiver):
+    return {"Authorization": f"Bearer {create_access_token(subject=str(caregiver.id))}"}
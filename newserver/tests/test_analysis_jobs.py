@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
+from app.models.dependent import Dependent
+from app.services.analysis_jobs import _claim_next_job, _finish_job
+
+RESULT = {"success": True, "result": {"score": 0.4}}
+
+
+def _job(db, caregiver, tmp_path, **kwargs):
+    dep = Dependent(name="dep", caregiver_id=caregiver.id)
+    db.add(dep)
+    db.commit()
+    job = AnalysisJob(dependent_id=dep.id, audio_dir=str(tmp_path), **kwargs)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def _stale(db, job_id):
+    db.query(AnalysisJob).filter_by(id=job_id).update(
+        {AnalysisJob.started_at: datetime.utcnow() - timedelta(minutes=settings.analysis_job_stale_min + 1)}
+    )
+    db.commit()
+
+
+def test_reclaimed_job_is_finished_once(db, caregiver, tmp_path):
+    job_id = _job(db, caregiver, tmp_path, status="QUEUED")
+    assert _claim_next_job() == (job_id, 1)
+    _stale(db, job_id)
+    assert _claim_next_job() == (job_id, 2)
+
+    # The original worker comes back late: its result is dropped
+    assert _finish_job(job_id, 1, RESULT) is False
+    assert _finish_job(job_id, 2, RESULT) is True
+    assert _finish_job(job_id, 2, RESULT) is False
+
+    db.expire_all()
+    assert db.query(Analysis).count() == 1
+    assert db.get(AnalysisJob, job_id).status == "DONE"
+
+
+def test_stale_job_fails_at_max_attempts(db, caregiver, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_max_attempts", 2)
+    job_id = _job(db, caregiver, tmp_path, status="QUEUED")
+    assert _claim_next_job() == (job_id, 1)
+    _stale(db, job_id)
+    assert _claim_next_job() == (job_id, 2)
+    _stale(db, job_id)
+
+    assert _claim_next_job() is None
+    db.expire_all()
+    job = db.get(AnalysisJob, job_id)
+    assert (job.status, job.attempts) == ("FAILED", 2)
+    assert not tmp_path.exists()
+
+
+def test_local_analysis_module_imports():
+    # The local fallback imports the AI service module as ai.analysis (not from inside ai/)
+    from app.services.analysis import _import_external_analysis
+    mod = _import_external_analysis()
+    assert mod is not None and mod.__name__ == "ai.analysis"
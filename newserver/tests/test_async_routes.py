@@ -0,0 +1,47 @@
+"""Routes on get_async_db / async_session_scope, run through ThreadedSession (DB_ASYNC=false)."""
+from datetime import datetime
+
+from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
+from app.models.dependent import Dependent
+from app.models.invitation import Invitation
+from app.services.images import store_image_bytes
+from app.utils.shorttokens import plus_minutes, utcnow
+
+
+def test_invitation_status_routes(client, db):
+    db.add(Invitation(code="STATUSCODE", status="connected", auth_code="x" * 40,
+                      created_at=utcnow(), expires_at=plus_minutes(15)))
+    db.commit()
+
+    status = client.get("/connections/statuscode/status")
+    assert status.status_code == 200
+    assert status.json() == {"status": "connected", "auth_code": "x" * 40}
+
+    events = client.get("/connections/statuscode/events")
+    assert events.status_code == 200
+    assert events.text.startswith("event: status\ndata: ")
+
+
+def test_analysis_routes(client, db, caregiver, auth_headers):
+    key = store_image_bytes(b"mel-image", "jpg")
+    dep = Dependent(name="dep", caregiver_id=caregiver.id, last_mel_image_key=key)
+    db.add(dep)
+    db.commit()
+    db.add_all([
+        Analysis(dependent_id=dep.id, state=0.3, risk_score=0.3, mel_image_key=key, created_at=datetime(2026, 3, 1, 1)),
+        AnalysisJob(dependent_id=dep.id, status="DONE", audio_dir="/nonexistent", score=0.3),
+    ])
+    db.commit()
+    base = f"/dependents/{dep.id}"
+
+    latest = client.get(f"{base}/analyses/latest", headers=auth_headers)
+    assert latest.status_code == 200 and latest.json()["state"] == 0.3
+    history = client.get(f"{base}/analyses/history", headers=auth_headers)
+    assert history.status_code == 200 and len(history.json()["analyses"]) == 1
+    assert client.get(f"{base}/analyses/trend", headers=auth_headers).status_code == 200
+    jobs = client.get(f"{base}/analyses/jobs", headers=auth_headers)
+    assert jobs.status_code == 200 and jobs.json()["jobs"][0]["status"] == "DONE"
+    image = client.get(f"{base}/mel-images/{key}", headers=auth_headers)
+    assert image.status_code == 200 and image.content == b"mel-image"
+    assert client.get("/dependents/999999/analyses/latest", headers=auth_headers).status_code == 404
@@ -0,0 +1,21 @@
+from app.models.dependent import Dependent
+from app.services.images import image_url
+
+
+def test_get_dependent_image_url_is_opt_in(client, db, caregiver, auth_headers):
+    dep = Dependent(name="dep", caregiver_id=caregiver.id, preferred_call_time="09:00", last_mel_image_key="ab" * 32)
+    db.add(dep)
+    db.commit()
+
+    plain = client.get(f"/dependents/{dep.id}", headers=auth_headers)
+    with_image = client.get(f"/dependents/{dep.id}?include_image=true", headers=auth_headers)
+
+    assert plain.status_code == 200
+    assert "last_mel_image_url" not in plain.json()
+    assert plain.json()["name"] == "dep"
+    assert with_image.json()["last_mel_image_url"] == image_url(dep.id, "ab" * 32)
+
+
+def test_get_dependent_has_response_schema(client):
+    responses = client.get("/openapi.json").json()["paths"]["/dependents/{dep_id}"]["get"]["responses"]
+    assert responses["200"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/DependentDetailOut"}
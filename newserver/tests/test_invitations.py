@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app.models.invitation import Invitation
+from app.services import call_scheduler
+from app.services.call_scheduler import call_schedule
+from app.utils.shorttokens import plus_minutes, utcnow
+
+
+def test_accept_invitation_schedules_dependent(client, db, auth_headers, monkeypatch):
+    # schedule_dependent only touches the heap while the scheduler task is running
+    monkeypatch.setattr(call_scheduler, "_task", object())
+    call_schedule.clear()
+    db.add(Invitation(code="ABCDEFGH", status="pending", created_at=utcnow(), expires_at=plus_minutes(15)))
+    db.commit()
+
+    resp = client.post(
+        "/connections/accept",
+        json={"code": "abcdefgh", "dependent": {"name": "dep", "preferred_call_time": "09:30"}},
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200
+    dep_id = resp.json()["dependent_id"]
+    due = call_schedule.pop_due(datetime.utcnow() + timedelta(days=2), limit=10)
+    assert [(e[2], e[3]) for e in due] == [(dep_id, 0)]
+    assert due[0][0] == call_scheduler.next_call_utc("09:30")
+    call_schedule.clear()
@@ -0,0 +1,66 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.middleware import BodySizeLimitMiddleware
+
+LIMIT = 64 * 1024
+BOUNDARY = "testboundary"
+
+
+def _upload_app():
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=LIMIT, path_prefix="/voice/")
+
+    @app.post("/voice/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def _chunked_multipart(payload: bytes, chunk_size: int = 8 * 1024):
+    # A generator body is sent with Transfer-Encoding: chunked (no Content-Length)
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a1.wav"\r\n'
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode()
+    for i in range(0, len(payload), chunk_size):
+        yield payload[i:i + chunk_size]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _post_chunked(client, payload: bytes):
+    return client.post(
+        "/voice/upload",
+        content=_chunked_multipart(payload),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+
+
+def test_chunked_upload_over_limit_gets_413():
+    resp = _post_chunked(_upload_app(), b"\0" * (LIMIT * 2))
+    assert resp.status_code == 413
+    assert resp.json() == {"detail": "Request body too large"}
+
+
+def test_chunked_upload_under_limit_passes():
+    resp = _post_chunked(_upload_app(), b"\0" * (LIMIT // 2))
+    assert resp.status_code == 200
+    assert resp.json() == {"size": LIMIT // 2}
+
+
+def test_content_length_over_limit_gets_413():
+    resp = _upload_app().post("/voice/upload", files={"file": ("a1.wav", b"\0" * (LIMIT * 2), "audio/wav")})
+    assert resp.status_code == 413
+
+
+def test_413_from_main_app_carries_cors_headers(client):
+    # BodySizeLimitMiddleware must sit inside CORSMiddleware, or browsers see an opaque CORS error
+    resp = client.post(
+        "/voice/answers",
+        content=b"x",
+        headers={"Content-Length": str(10 ** 10), "Origin": "http://app.example.com"},
+    )
+    assert resp.status_code == 413
+    assert resp.headers.get("access-control-allow-origin")
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.dependent import Dependent
+from app.services import call_scheduler, personal_questions
+
+
+def _add_dependents(db, caregiver, times):
+    deps = [Dependent(name=f"dep{i}", caregiver_id=caregiver.id, preferred_call_time=t) for i, t in enumerate(times)]
+    db.add_all(deps)
+    db.commit()
+    return [d.id for d in deps]
+
+
+def test_due_dependents_from_time_window(db, caregiver, monkeypatch):
+    monkeypatch.setattr(settings, "personal_questions_lead_min", 120)
+    # 23:10 local: the window wraps past midnight; "0:30" is an unpadded hour
+    now_local = datetime(2026, 3, 2, 23, 10)
+    ids = _add_dependents(db, caregiver, ["23:30", "0:30", "01:05", "01:20", "12:00", "23:00"])
+
+    due = personal_questions._due_dependents(now_local)
+
+    assert [(d[0], d[2].isoformat()) for d in due] == [
+        (ids[0], "2026-03-02"), (ids[1], "2026-03-03"), (ids[2], "2026-03-03"),
+    ]
+
+
+def test_due_dependents_from_call_schedule(db, caregiver, monkeypatch):
+    monkeypatch.setattr(settings, "personal_questions_lead_min", 120)
+    monkeypatch.setattr(call_scheduler, "_task", object())
+    ids = _add_dependents(db, caregiver, ["09:00", "09:00", "09:00"])
+    now = datetime.utcnow()
+    call_scheduler.call_schedule.clear()
+    call_scheduler.call_schedule.push(ids[0], now + timedelta(minutes=30))
+    call_scheduler.call_schedule.push(ids[1], now + timedelta(hours=5))
+    call_scheduler.call_schedule.push(ids[2], now + timedelta(minutes=10), attempt=1, call_id=1)
+
+    due = personal_questions._due_dependents(call_scheduler.local_now())
+
+    assert [d[0] for d in due] == [ids[0]]
+    call_scheduler.call_schedule.clear()
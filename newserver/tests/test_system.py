@@ -0,0 +1,24 @@
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+def test_health_is_public(client):
+    assert client.get("/system/health").status_code == 200
+
+
+def test_metrics_require_admin(client, db, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "system_metrics_public", False)
+    admin = User(name="admin", email="admin@example.com", password_hash="x", role="ADMIN")
+    db.add(admin)
+    db.commit()
+    admin_headers = {"Authorization": f"Bearer {create_access_token(subject=str(admin.id))}"}
+
+    assert client.get("/system/call-scheduler").status_code == 401
+    assert client.get("/system/call-scheduler", headers=auth_headers).status_code == 403
+    assert client.get("/system/call-scheduler", headers=admin_headers).status_code == 200
+
+
+def test_metrics_public_flag(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "system_metrics_public", True)
+    assert client.get("/system/principal-cache").status_code == 200
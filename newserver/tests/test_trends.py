@@ -0,0 +1,23 @@
+from datetime import date, datetime
+
+from app.models.analysis_rollup import AnalysisDailyRollup
+from app.models.dependent import Dependent
+from app.services.trends import record_analysis_rollup
+
+
+def test_rollup_upserts_into_local_day(db, caregiver):
+    dep = Dependent(name="dep", caregiver_id=caregiver.id)
+    db.add(dep)
+    db.commit()
+
+    # 15:30 UTC is 00:30 KST the next day (CALL_TZ_OFFSET_MIN default 540)
+    record_analysis_rollup(db, dep.id, datetime(2026, 3, 1, 15, 30), 0.2)
+    record_analysis_rollup(db, dep.id, datetime(2026, 3, 1, 20, 0), 0.6)
+    record_analysis_rollup(db, dep.id, datetime(2026, 3, 1, 10, 0), 0.5)
+    db.commit()
+
+    rows = {r.day: r for r in db.query(AnalysisDailyRollup).filter_by(dependent_id=dep.id)}
+    assert sorted(rows) == [date(2026, 3, 1), date(2026, 3, 2)]
+    day = rows[date(2026, 3, 2)]
+    assert (day.count, round(day.state_sum, 4), day.state_min, day.state_max) == (2, 0.8, 0.2, 0.6)
+    assert rows[date(2026, 3, 1)].count == 1